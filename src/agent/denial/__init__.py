@@ -1,7 +1,8 @@
 """Denial evaluator agent for PA denial analysis."""
 
 from .agent import (
-    evaluate_denial
+    evaluate_denial,
+    batch_evaluate_denial
 )
 
 from .state import (
@@ -12,6 +13,7 @@ from .state import (
 
 __all__ = [
     "evaluate_denial",
+    "batch_evaluate_denial",
     "DenialEvaluationResult",
     "RecommendedAction"
 ]
@@ -1,8 +1,16 @@
 """Workflow for evaluating PA denial decisions."""
 
+import asyncio
+import contextlib
+import copy
+import dataclasses
+import itertools
 import json
-from typing import Literal, Optional, Dict, Any, List
+import logging
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Union
 from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.utils.json import parse_partial_json
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 from langgraph.graph.state import CompiledStateGraph
@@ -11,8 +19,12 @@ from langchain.agents import create_agent
 from langchain.agents.structured_output import ProviderStrategy
 from langchain_core.runnables import RunnableConfig
 from langgraph.runtime import Runtime
+from pydantic import ValidationError
 
 
+from ..cache import TTLCache, make_cache_key
+from ..http_client import shared_async_http_client
+from .cache import DenialCategorizationCache, GapAnalysisCache
 from .state import (
     DenialEvaluatorState,
     DenialDetails,
@@ -20,6 +32,7 @@ from .state import (
     Evidence,
     EvidenceGathering,
     Judgement,
+    RevisionGate,
     RecommendedAction,
     DenialCategorization,
     DenialEvaluationResult,
@@ -47,17 +60,91 @@ from ...tools import (
     lookup_policy_criteria,
 )
 
-from ...models import ServiceInfo, ClinicalContext, UploadDocument
+from ...integrations.ehr_service import get_patient_summary
+from ...models import (
+    ServiceInfo,
+    ClinicalContext,
+    UploadDocument,
+    PatientDataRequest,
+    PHICategory,
+    AccessPurpose,
+)
+
+
+# Static system messages, shared across invocations so every request sends a byte-identical prefix
+_CATEGORIZER_SYSTEM_MESSAGE = SystemMessage(content=CATEGORIZER_SYSTEM_PROMPT)
+_REASONING_SYSTEM_MESSAGE = SystemMessage(content=REASONING_SYSTEM_PROMPT)
+
+
+DEFAULT_MODEL_ID = "gpt-4o"
+
+
+@lru_cache(maxsize=None)
+def _get_chat_model(model_id: str, prompt_cache_key: Optional[str] = None) -> ChatOpenAI:
+    """Return the shared chat client for a model and optional prompt cache key.
+
+    The key routes a stage's requests to the same OpenAI prompt cache, so the
+    static system prompt prefix is served from cache instead of re-prefilled.
+    """
+    model_kwargs = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}
+    return ChatOpenAI(
+        model=model_id,
+        timeout=20,
+        max_retries=3,
+        model_kwargs=model_kwargs,
+        http_async_client=shared_async_http_client,
+    )
+
+
+logger = logging.getLogger(__name__)
+
+
+# Code linkages checked up front; the evidence gatherer can still validate any other pair itself
+MAX_PREFETCH_CODE_PAIRS = 10
+
+# Categorizations reused across evaluations of the same denial reason and service codes
+_categorization_cache = DenialCategorizationCache()
+# Gap analyses reused across patients with the same payer plan and denial archetype
+_gap_analysis_cache = GapAnalysisCache()
+
+
+# Judgement key streamed right after the revision gate fields; once it starts, they are complete
+_GATE_END_KEY = '"rationale"'
+_GATE_FIELDS = frozenset(RevisionGate.model_fields)
+
+
+def _read_revision_gate(content: str) -> Optional[RevisionGate]:
+    """Validate the revision gate from a partial judgement; None if it is incomplete or invalid."""
+    partial = parse_partial_json(content)
+    if not isinstance(partial, dict) or not _GATE_FIELDS <= partial.keys():
+        return None
+    try:
+        return RevisionGate.model_validate({field: partial[field] for field in _GATE_FIELDS})
+    except ValidationError:
+        return None
 
 
 # Console output helper
 def log_denial(message: str) -> None:
-    """Print formatted status message for denial evaluation."""
-    print(f"   ├─ Denial Agent: {message}")
+    """Log formatted status message for denial evaluation."""
+    logger.info("   ├─ Denial Agent: %s", message)
+
+
+def create_categorizer_llm(model_id: str = DEFAULT_MODEL_ID):
+    return _get_chat_model(model_id).with_structured_output(
+        schema=DenialCategorization, method="json_schema", prompt_cache_key="pa-denial-categorizer", temperature=0
+    )
+
+
+def build_categorizer_messages(state: DenialEvaluatorState) -> list:
+    return [
+        _CATEGORIZER_SYSTEM_MESSAGE,
+        HumanMessage(content=build_categorizer_user_prompt(state))
+    ]
 
 
 def create_gap_analysis_agent(model_id) -> CompiledStateGraph:
-    model = ChatOpenAI(model=model_id, timeout=20, max_retries=3)
+    model = _get_chat_model(model_id, "pa-denial-gap-analysis")
     agent = create_agent(
         model=model,
         tools=[lookup_policy_criteria],
@@ -67,7 +154,7 @@ def create_gap_analysis_agent(model_id) -> CompiledStateGraph:
     return agent
 
 def create_evidence_gatherer_agent(model_id):
-    model = ChatOpenAI(model=model_id, timeout=20, max_retries=3)
+    model = _get_chat_model(model_id, "pa-denial-evidence-gatherer")
     agent = create_agent(
         model=model,
         tools=[
@@ -84,11 +171,14 @@ def create_evidence_gatherer_agent(model_id):
     return agent
 
 
-def create_denial_evaluation_workflow(model_id: str = "gpt-4o"):
+def create_denial_evaluation_workflow(model_id: str = DEFAULT_MODEL_ID):
     """Create the denial evaluator workflow"""
     
     # Initialize LLMs
-    llm = ChatOpenAI(model=model_id, timeout=20, max_retries=3)
+    llm = _get_chat_model(model_id)
+    categorizer_llm = create_categorizer_llm(model_id)
+    # Streamed so the revision gate can be decided before the full judgement arrives
+    reasoning_llm = llm.bind(response_format=Judgement, prompt_cache_key="pa-denial-reasoning")
     gap_analyst = create_gap_analysis_agent(model_id)
     evidence_gatherer = create_evidence_gatherer_agent(model_id)
 
@@ -96,14 +186,14 @@ def create_denial_evaluation_workflow(model_id: str = "gpt-4o"):
         """Categorize the denial decision."""
         log_denial("Categorizing denial reason...")
 
-        user_message = build_categorizer_user_prompt(state)
-        messages = [
-            SystemMessage(content=CATEGORIZER_SYSTEM_PROMPT),
-            HumanMessage(content=user_message)
-        ]
-
-        llm_with_structure_output = llm.with_structured_output(schema=DenialCategorization)
-        response: DenialCategorization = await llm_with_structure_output.ainvoke(messages)
+        cache_key = DenialCategorizationCache.make_key(
+            state["denial_details"], state["service_details"], state.get("clinical_context")
+        )
+        response = _categorization_cache.get(cache_key)
+        if response is None:
+            messages = build_categorizer_messages(state)
+            response: DenialCategorization = await categorizer_llm.ainvoke(messages)
+            _categorization_cache.set(cache_key, response)
 
         if response.category in REVISE_CATEGORIES:
             return {
@@ -117,15 +207,75 @@ def create_denial_evaluation_workflow(model_id: str = "gpt-4o"):
             "root_cause": response.root_cause
         }
 
+    async def prefetch_evidence_node(state: DenialEvaluatorState, runtime: Runtime) -> dict:
+        """Fetch the case records every evidence search needs, concurrently with gap analysis."""
+        log_denial("Prefetching patient records and procedure details...")
+
+        service: ServiceInfo = state["service_details"]
+        patient_id = runtime.context.get("patient_id")
+
+        lookups = {}
+        if patient_id:
+            lookups["patient_health_record"] = asyncio.to_thread(
+                get_patient_summary,
+                PatientDataRequest(
+                    patient_id=patient_id,
+                    categories=[PHICategory.CLINICAL, PHICategory.TREATMENT],
+                    purpose=AccessPurpose.CLINICAL_REVIEW,
+                    requester_id="pa_agent_workflow",
+                    justification="Prefetch clinical and treatment history for denial evidence gathering"
+                )
+            )
+        lookups["procedure_details"] = get_procedure_details.ainvoke({"codes": service.cpt_codes})
+        if service.hcpcs_codes:
+            lookups["drug_coverage_details"] = get_drug_coverage_details.ainvoke({"codes": service.hcpcs_codes})
+        code_pairs = list(itertools.islice(itertools.product(service.cpt_codes, service.dx_codes), MAX_PREFETCH_CODE_PAIRS))
+        validations = [validate_codes.ainvoke({"cpt": cpt, "icd": icd}) for cpt, icd in code_pairs]
+
+        # Prefetching is only a head start: a failed lookup is left for the evidence
+        # gatherer to retry with its own tools rather than failing the evaluation
+        results = await asyncio.gather(*lookups.values(), *validations, return_exceptions=True)
+        for name, result in zip([*lookups, *(f"validate_codes {cpt}/{icd}" for cpt, icd in code_pairs)], results):
+            if isinstance(result, Exception):
+                logger.warning("Prefetch of %s failed: %s", name, result)
+        fetched = {
+            name: None if isinstance(result, Exception) else result
+            for name, result in zip(lookups, results)
+        }
+
+        patient_summary = fetched.get("patient_health_record")
+        procedures = fetched.get("procedure_details")
+        drugs = fetched.get("drug_coverage_details", [])
+        return {
+            "prefetched_records": {
+                "patient_health_record": patient_summary.model_dump(mode="json") if patient_summary else None,
+                "procedure_details": [p.model_dump() for p in procedures] if procedures is not None else None,
+                "drug_coverage_details": [d.model_dump() for d in drugs] if drugs is not None else None,
+                "code_validations": [
+                    c.model_dump() for c in results[len(lookups):] if not isinstance(c, Exception)
+                ],
+            }
+        }
+
     async def gap_analyst_node(state: DenialEvaluatorState, runtime: Runtime) -> dict:
         log_denial("Analyzing gaps and creating evidence search plan...")
 
-        user_message = build_gap_analysis_user_prompt(state)
-        result = await gap_analyst.ainvoke(
-            {"messages": [HumanMessage(content=user_message)]},
-            context=runtime.context
+        cache_key = GapAnalysisCache.make_key(
+            runtime.context.get("payer_id"),
+            runtime.context.get("plan_id"),
+            state["category"],
+            state["denial_details"],
+            state["service_details"],
         )
-        response: GapAnalysis = result["structured_response"]
+        response = _gap_analysis_cache.get(cache_key)
+        if response is None:
+            user_message = build_gap_analysis_user_prompt(state)
+            result = await gap_analyst.ainvoke(
+                {"messages": [HumanMessage(content=user_message)]},
+                context=runtime.context
+            )
+            response: GapAnalysis = result["structured_response"]
+            _gap_analysis_cache.set(cache_key, response)
 
         return {
             "required_evidence": response.required_evidence,
@@ -153,23 +303,55 @@ def create_denial_evaluation_workflow(model_id: str = "gpt-4o"):
     async def reasoning_node(state: DenialEvaluatorState) -> dict:
         log_denial("Evaluating evidence and determining recommendation...")
         
+        revision_count = state["revision_count"]
+        found_evidence = state.get("found_evidence", [])
+
+        # A revision that found nothing new cannot lift the low first-pass confidence; no judgement
+        # is made, and the provisional confidence sends the case to human review
+        if revision_count >= 1 and len(found_evidence) == state["revision_evidence_count"]:
+            log_denial("Revision found no new evidence, leaving the decision to human review")
+            return {"need_revision": False}
+
         user_message = build_reasoning_user_prompt(state)
         messages = [
-            SystemMessage(content=REASONING_SYSTEM_PROMPT),
+            _REASONING_SYSTEM_MESSAGE,
             HumanMessage(content=user_message)
         ]
-        llm_with_structure_output = llm.with_structured_output(schema=Judgement)
-        response: Judgement = await llm_with_structure_output.ainvoke(messages)
-        
-        revision_count = state.get("revision_count", 0)
-        
-        if response.confidence_score < 0.7 and response.require_more_evidence and revision_count < 1:
-            return {
-                "required_evidence": response.require_more_evidence,
-                "search_plan": response.search_plan,
-                "need_revision": True,
-                "revision_count": revision_count + 1
-            }
+        gate_decided = revision_count >= 1
+        parts: List[str] = []
+        # End of the text already scanned, so a key split across chunks is still found
+        tail = ""
+
+        async with contextlib.aclosing(reasoning_llm.astream(messages)) as stream:
+            async for chunk in stream:
+                parts.append(chunk.text)
+                if gate_decided:
+                    continue
+
+                # The gate is parsed only once its closing key has started, not on every chunk
+                window = tail + chunk.text
+                tail = window[-(len(_GATE_END_KEY) - 1):]
+                if _GATE_END_KEY not in window:
+                    continue
+                gate = _read_revision_gate("".join(parts))
+                if gate is None:
+                    # The key text was part of a value, or the fields did not validate; keep streaming
+                    continue
+
+                gate_decided = True
+                if gate.confidence_score < 0.7 and gate.require_more_evidence:
+                    log_denial("Low confidence, revisiting evidence before full judgement")
+                    return {
+                        "required_evidence": gate.require_more_evidence,
+                        "search_plan": gate.search_plan,
+                        "recommendation": gate.recommendation,
+                        "provisional_confidence": gate.confidence_score,
+                        "revision_evidence_count": len(found_evidence),
+                        "need_revision": True,
+                        "revision_count": revision_count + 1
+                    }
+
+        response = Judgement.model_validate_json("".join(parts))
         
         return {
             "judgement": response,
@@ -177,13 +359,14 @@ def create_denial_evaluation_workflow(model_id: str = "gpt-4o"):
             "need_revision": False,
         }
 
-    def route_after_categorize(state: DenialEvaluatorState) -> Literal["gap_analyst", END]:
-        if state.get("recommendation"):
+    def route_after_categorize(state: DenialEvaluatorState) -> Union[str, List[str]]:
+        if state["recommendation"]:
             return END
-        return "gap_analyst"
+        # Policy lookup and record prefetch are independent; run them side by side
+        return ["gap_analyst", "prefetch_evidence"]
 
-    def route_after_reasoning(state: DenialEvaluatorState) -> Literal["evidence_gatherer", END]:
-        if state.get("need_revision", False):
+    def route_after_reasoning(state: DenialEvaluatorState) -> str:
+        if state["need_revision"]:
             return "evidence_gatherer"
         return END
     
@@ -191,20 +374,62 @@ def create_denial_evaluation_workflow(model_id: str = "gpt-4o"):
     workflow = StateGraph(DenialEvaluatorState)
     workflow.add_node("categorize", categorizer_node)
     workflow.add_node("gap_analyst", gap_analyst_node)
+    workflow.add_node("prefetch_evidence", prefetch_evidence_node)
     workflow.add_node("evidence_gatherer", evidence_gather_node)
     workflow.add_node("reasoner", reasoning_node)
     
     workflow.set_entry_point("categorize")
-    workflow.add_conditional_edges("categorize", route_after_categorize)
-    workflow.add_edge("gap_analyst", "evidence_gatherer")
+    workflow.add_conditional_edges("categorize", route_after_categorize, ["gap_analyst", "prefetch_evidence", END])
+    workflow.add_edge(["gap_analyst", "prefetch_evidence"], "evidence_gatherer")
     workflow.add_edge("evidence_gatherer", "reasoner")
-    workflow.add_conditional_edges("reasoner", route_after_reasoning)
+    workflow.add_conditional_edges("reasoner", route_after_reasoning, ["evidence_gatherer", END])
     
     return workflow.compile()
 
 
 _denial_evaluation_workflow = create_denial_evaluation_workflow()
 
+# Completed evaluations, reused when the same denial for the same case is evaluated again
+_evaluation_cache: TTLCache[DenialEvaluationResult] = TTLCache(maxsize=1024, ttl_seconds=24 * 60 * 60)
+
+_MAX_CONCURRENT_EVALUATIONS = 16
+_batch_categorizer_llm = create_categorizer_llm()
+
+# Control fields every run starts with, so nodes and routers can index state directly
+_INITIAL_STATE_DEFAULTS = {
+    "revision_count": 0,
+    "need_revision": False,
+    "recommendation": None,
+}
+
+
+def _evaluation_cache_key(
+    patient_id: str,
+    denial_reason: str,
+    decision_details: Optional[Dict[str, Any]],
+    payer_id: str,
+    plan_id: str,
+    service_details: ServiceInfo,
+    clinical_context: ClinicalContext,
+    documents_shared: Optional[List[UploadDocument]]
+) -> str:
+    # Evidence comes from the patient's own records, so results are never shared across patients.
+    # Every service and clinical field reaches a prompt, so all of them are part of the key.
+    code_fields = {"cpt_codes", "hcpcs_codes", "dx_codes"}
+    return make_cache_key(
+        patient_id,
+        payer_id,
+        plan_id,
+        denial_reason,
+        decision_details,
+        sorted(service_details.cpt_codes),
+        sorted(service_details.hcpcs_codes),
+        sorted(service_details.dx_codes),
+        service_details.model_dump(mode="json", exclude=code_fields),
+        clinical_context.model_dump(mode="json"),
+        sorted(doc.document_id for doc in documents_shared or []),
+    )
+
 async def evaluate_denial(
     patient_id: str,
     denial_reason: str,
@@ -217,18 +442,27 @@ async def evaluate_denial(
     documents_shared: List[UploadDocument]
 ) -> DenialEvaluationResult:
     """Evaluate a PA denial and recommend next steps."""
-    
+
+    cache_key = _evaluation_cache_key(
+        patient_id, denial_reason, decision_details, payer_id, plan_id,
+        service_details, clinical_context, documents_shared
+    )
+    cached = _evaluation_cache.get(cache_key)
+    if cached is not None:
+        log_denial("Reusing cached evaluation for this denial")
+        return copy.deepcopy(cached)
+
     denial_details = DenialDetails(
         denial_reason=denial_reason,
         decision_details=decision_details
     )
     
     initial_state : DenialEvaluatorState = {
+        **_INITIAL_STATE_DEFAULTS,
         "denial_details": denial_details,
         "service_details": service_details,
         "clinical_context": clinical_context,
         "documents_shared": documents_shared,
-        "revision_count": 0
     }
     
     result = await _denial_evaluation_workflow.ainvoke(
@@ -244,19 +478,28 @@ async def evaluate_denial(
     judgement: Judgement = result.get("judgement")
     evidences: List[Evidence] = []
     if judgement:
-        for citation in judgement.evidence_citations:
-            try:
-                evidences.append(result.get("found_evidence")[citation])
-            except:
-                continue
+        found_evidence: List[Evidence] = result.get("found_evidence") or []
+        # Drop citations the model made up rather than failing the evaluation
+        evidences = [
+            found_evidence[citation]
+            for citation in judgement.evidence_citations
+            if 0 <= citation < len(found_evidence)
+        ]
 
     recommendation = result.get("recommendation")
     if recommendation is None and judgement:
         recommendation = judgement.recommendation
 
-    return DenialEvaluationResult(
+    if judgement:
+        confidence_score = judgement.confidence_score
+    else:
+        # Categorization alone settled the denial, or a revision found nothing new and the
+        # first pass's low confidence is kept so the caller escalates
+        confidence_score = result.get("provisional_confidence", 1.0)
+
+    evaluation = DenialEvaluationResult(
         recommendation=recommendation,
-        confidence_score=judgement.confidence_score if judgement else 1.0, #for only categorization case
+        confidence_score=confidence_score,
         root_cause=result.get("root_cause"),
         evidences=evidences,
         appeal_strength_score=judgement.appeal_strength_score if judgement else 0,
@@ -264,6 +507,61 @@ async def evaluate_denial(
         required_documentation=judgement.required_documentation if judgement else None,
         policy_references=result.get("policy_references", [])
     )
+    if evaluation.confidence_score >= 0.7:
+        # Low-confidence results go to human review and should be retried fresh next time
+        _evaluation_cache.set(cache_key, evaluation)
+    return copy.deepcopy(evaluation)
+
+
+async def _precategorize_denials(cases: List[Dict[str, Any]]) -> None:
+    """Categorize a batch's uncached denials in one batched call, seeding the categorization cache.
+
+    Cases with the same denial and service codes are categorized once.
+    """
+    pending: Dict[str, list] = {}
+    for case in cases:
+        state: DenialEvaluatorState = {
+            "denial_details": DenialDetails(
+                denial_reason=case["denial_reason"],
+                decision_details=case["decision_details"]
+            ),
+            "service_details": case["service_details"],
+            "clinical_context": case["clinical_context"],
+        }
+        cache_key = DenialCategorizationCache.make_key(
+            state["denial_details"], state["service_details"], state.get("clinical_context")
+        )
+        if cache_key not in pending and _categorization_cache.get(cache_key) is None:
+            pending[cache_key] = build_categorizer_messages(state)
+
+    if not pending:
+        return
+
+    log_denial(f"Categorizing {len(pending)} denials in one batch...")
+    results = await _batch_categorizer_llm.abatch(
+        list(pending.values()),
+        config=RunnableConfig(max_concurrency=_MAX_CONCURRENT_EVALUATIONS),
+        return_exceptions=True
+    )
+    for cache_key, categorization in zip(pending, results):
+        # Failed items are left to the categorizer node, which retries them per case
+        if isinstance(categorization, DenialCategorization):
+            _categorization_cache.set(cache_key, categorization)
+
+
+async def batch_evaluate_denial(cases: List[Dict[str, Any]]) -> List[DenialEvaluationResult]:
+    """Evaluate several PA denials concurrently, returning results in input order.
+
+    Each case holds the keyword arguments of evaluate_denial.
+    """
+    await _precategorize_denials(cases)
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_EVALUATIONS)
+
+    async def evaluate_case(case: Dict[str, Any]) -> DenialEvaluationResult:
+        async with semaphore:
+            return await evaluate_denial(**case)
+
+    return await asyncio.gather(*(evaluate_case(case) for case in cases))
 
 
 if __name__ == "__main__":
@@ -287,6 +585,6 @@ if __name__ == "__main__":
             service_details=intake.service_info,
             clinical_context=ClinicalContext(clinical_notes=intake.clinical_notes, primary_diagnosis="Intervertebral disc degeneration, lumbar region")
         )
-        print(json.dumps(result.model_dump(), indent=2))
+        print(json.dumps(dataclasses.asdict(result), indent=2, default=str))
 
     asyncio.run(main())
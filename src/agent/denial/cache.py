@@ -0,0 +1,82 @@
+"""Response caches for the denial categorization and gap analysis stages."""
+
+from typing import Optional
+
+from ..cache import TTLCache, make_cache_key
+from .state import DenialCategorization, DenialCategory, DenialDetails, GapAnalysis
+from ...models import ClinicalContext, ServiceInfo
+
+
+class DenialCategorizationCache:
+    """Caches categorizations by every field the categorizer prompt renders.
+
+    The prompt includes the clinical context, so the root cause may quote a
+    patient's clinical facts; keying on that context keeps one patient's
+    categorization from being returned for another.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 7 * 24 * 60 * 60):
+        self._cache: TTLCache[DenialCategorization] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def make_key(denial: DenialDetails, service: ServiceInfo, clinical: Optional[ClinicalContext]) -> str:
+        return make_cache_key(
+            denial.denial_reason,
+            denial.decision_details,
+            sorted(service.cpt_codes),
+            sorted(service.hcpcs_codes),
+            sorted(service.dx_codes),
+            service.site_of_service,
+            service.urgency_level,
+            clinical.model_dump(mode="json", exclude={"supporting_documents"}) if clinical else None,
+        )
+
+    def get(self, key: str) -> Optional[DenialCategorization]:
+        # Categorizations are frozen and hold no containers, so they are shared as-is
+        return self._cache.get(key)
+
+    def set(self, key: str, categorization: DenialCategorization) -> None:
+        self._cache.set(key, categorization)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class GapAnalysisCache:
+    """Caches gap analyses per payer plan, denial category, denial reason and service codes.
+
+    Gap analysis only consults payer policy, never patient records, so a result
+    can be reused for any case that shares these inputs.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 24 * 60 * 60):
+        self._cache: TTLCache[GapAnalysis] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def make_key(
+        payer_id: str,
+        plan_id: str,
+        category: DenialCategory,
+        denial: DenialDetails,
+        service: ServiceInfo
+    ) -> str:
+        return make_cache_key(
+            payer_id,
+            plan_id,
+            category,
+            denial.denial_reason,
+            denial.decision_details,
+            sorted(service.cpt_codes),
+            sorted(service.hcpcs_codes),
+            sorted(service.dx_codes),
+        )
+
+    def get(self, key: str) -> Optional[GapAnalysis]:
+        cached = self._cache.get(key)
+        return cached.model_copy(deep=True) if cached is not None else None
+
+    def set(self, key: str, gap_analysis: GapAnalysis) -> None:
+        self._cache.set(key, gap_analysis)
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -1,9 +1,11 @@
 """State schema for the denial evaluator agent."""
 
-import operator
+from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Optional, Dict, Any, Literal, Annotated
 from datetime import datetime
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
 from langgraph.graph import MessagesState
 from enum import Enum
 
@@ -21,7 +23,7 @@ class DenialCategory(str, Enum):
     PLACE_OF_SERVICE = "place_of_service"
     OTHER = "other"
 
-REVISE_CATEGORIES = [DenialCategory.MISSING_DOCUMENTATION, DenialCategory.INCORRECT_CODE, DenialCategory.MISSING_DETAILS]
+REVISE_CATEGORIES = frozenset({DenialCategory.MISSING_DOCUMENTATION, DenialCategory.INCORRECT_CODE, DenialCategory.MISSING_DETAILS})
 
 class RecommendedAction(str, Enum):
     """Recommended next steps after denial evaluation."""
@@ -32,16 +34,27 @@ class RecommendedAction(str, Enum):
 
 class DenialDetails(BaseModel):
     """Details about the denial being evaluated."""
+    model_config = ConfigDict(frozen=True)
+
     denial_reason: str = Field(None, description="Reason for denial")
     decision_details: Optional[Dict[str, Any]] = Field(None, description="Details of denial")
 
+    @cached_property
+    def decision_details_json(self) -> Optional[str]:
+        """Decision details serialized once for every prompt that includes them."""
+        return orjson.dumps(self.decision_details, default=str).decode() if self.decision_details else None
+
 class DenialCategorization(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     category: DenialCategory = Field(..., description="The categorized denial type")
     root_cause: str = Field(..., description="Root cause for the denial")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in categorization")
 
 class GapAnalysis(BaseModel):
     """Analysis of gaps between denial and supporting documentation."""
+    model_config = ConfigDict(frozen=True)
+
     required_evidence: List[str] = Field(..., description="List of evidence requirements to close the gap")
     identified_gaps: List[str] = Field(..., description="Gaps found for the denial reason")
     search_plan: List[str] = Field(..., description="Specific instructions/plan for gathering data using EHR/Policy/Medical research tools")
@@ -50,19 +63,29 @@ class GapAnalysis(BaseModel):
     
 class Evidence(BaseModel):
     """Evidence gathered during gap analysis."""
+    model_config = ConfigDict(frozen=True)
+
     source: str = Field(..., description="Where evidence was found, mention specific section/page reference and source type")
     evidence_type: str = Field(..., description="Type of evidence (e.g., 'clinical_guideline', 'lab_result', 'policy', etc.)")
     fact: str = Field(..., description="The actual evidence content as it's")
     relevance: float = Field(..., ge=0.0, le=1.0, description="Relevance score as a decimal between 0.0 and 1.0")
 
 class EvidenceGathering(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     found_evidences: List[Evidence] = Field(..., description="List of evidence gathered")
     missing_evidence: List[str] = Field(..., description="List of evidence you couldn't find")
 
 class Judgement(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # Revision gate fields come first so they can be read from a partial stream
+    confidence_score: float = Field(..., ge=0.0, le=1.0, description="Confidence in recommendation")
+    require_more_evidence: Optional[List[str]] = Field(default_factory=list, description="If more evidence is needed, list what that is")
+    search_plan: List[str] = Field(..., description="Specific instructions/plan for gathering data using EHR/Policy/Medical research tools")
+
     recommendation: RecommendedAction = Field(..., description="Recommended next step based on evidence gathered")
     rationale: str = Field(..., description="Internal technical explanation of why this path was chosen.")
-    confidence_score: float = Field(..., ge=0.0, le=1.0, description="Confidence in recommendation")
     evidence_citations: List[int] = Field(..., description="List of indices of found evidence used in this judgement, 0 based indexing")
 
     appeal_strength_score: int = Field(ge=0, le=100, description="Confidence score (0-100) in winning the appeal if recommendation is Appeal")
@@ -70,8 +93,42 @@ class Judgement(BaseModel):
     required_documentation: Optional[List[str]] = Field(default_factory=list, description="Documents needed if resubmitting or appeal")
 
     write_off_reason: Optional[str] = Field(description="Why we should stop: e.g., 'Policy explicitly excludes this service under all conditions'.")
-    require_more_evidence: Optional[List[str]] = Field(default_factory=list, description="If more evidence is needed, list what that is")
-    search_plan: List[str] = Field(..., description="Specific instructions/plan for gathering data using EHR/Policy/Medical research tools")
+
+
+class RevisionGate(BaseModel):
+    """Leading Judgement fields, validated from a partial stream to decide on another evidence pass."""
+    model_config = ConfigDict(frozen=True)
+
+    confidence_score: float = Field(..., ge=0.0, le=1.0)
+    require_more_evidence: Optional[List[str]] = Field(default_factory=list)
+    search_plan: List[str]
+    recommendation: RecommendedAction
+
+
+def _append_evidence(existing: List[Evidence], new: List[Evidence]) -> List[Evidence]:
+    """Reducer for found_evidence that drops facts already gathered from the same source.
+
+    Revision passes often re-find the same record, and duplicates only inflate
+    the reasoning prompt. Deduplicating here rather than at prompt time keeps
+    the judgement's evidence_citations indices aligned with this list.
+
+    The result is never built by mutating `existing` in place: LangGraph shares
+    channel values between shallow channel copies (e.g. fresh reads for
+    conditional edges), so in-place extension would duplicate evidence.
+    """
+    seen = {(e.fact.strip(), e.source.strip()) for e in existing}
+    fresh = []
+    for evidence in new:
+        key = (evidence.fact.strip(), evidence.source.strip())
+        if key not in seen:
+            seen.add(key)
+            fresh.append(evidence)
+
+    if not existing:
+        return fresh
+    if not fresh:
+        return existing
+    return existing + fresh
 
 
 class DenialEvaluatorState(MessagesState):
@@ -93,16 +150,21 @@ class DenialEvaluatorState(MessagesState):
     policy_references: List[str]
 
     #Evidence gatherer
-    found_evidence: Annotated[List[Evidence], operator.add]
+    prefetched_records: Dict[str, Any]
+    found_evidence: Annotated[List[Evidence], _append_evidence]
     missing_evidence: List[str]
 
     #Judge
     recommendation: RecommendedAction
     judgement: Judgement
     revision_count: int
+    provisional_confidence: float  # first-pass confidence when a revision was requested
+    revision_evidence_count: int  # evidence found before the revision search
     
 
-class DenialEvaluationResult(BaseModel):
+@dataclass(frozen=True, slots=True)
+class DenialEvaluationResult:
+    """Evaluation outcome, assembled from already validated workflow output."""
     root_cause: str
     recommendation: RecommendedAction
     confidence_score: float
@@ -1,11 +1,13 @@
 from .state import DenialCategory
 
+_DENIAL_CATEGORY_BLOCK = "\n".join(f"- {d.value}" for d in DenialCategory)
+
 CATEGORIZER_SYSTEM_PROMPT = f"""You are a healthcare prior authorization denial categorization specialist.
 
 Your role is to analyze PA denial reasons and classify them into the appropriate category.
 
 ## Denial Categories
-{chr(10).join(f"- {d.value}" for d in DenialCategory)}
+{_DENIAL_CATEGORY_BLOCK}
 
 ## Your Task
 1. Analyze the denial reason and decision details alongside the case context provided
@@ -71,6 +73,7 @@ Your role is to systematically collect evidence following the search plan to sup
 5. Limit yourself on total tool calls - be strategic about which searches matter most. Stop if no new information
 6. Different justification for a tool call will not change the tool output
 7. Stop after you have gathered enough evidence to make a recommendation or there is no new information to be found
+8. Prefetched Records (patient health record, procedure/drug details, code validations) are already retrieved - use them and only call tools for information they don't cover
 """
 
 REASONING_SYSTEM_PROMPT = f"""You are a Medical Director specialize in prior authorization appeal strategy.
@@ -96,7 +99,7 @@ Your role is to analyze gathered evidence and make a recommendation on how to pr
 1. Review the denial category, root cause, and gathered evidence
 2. Evaluate the strength of evidence for and against the denial
 3. Determine the most appropriate recommended action (always choose between APPEAL, REVISE_AND_RESUBMIT, FINAL_DENIAL)
-4. Provide clear rationale with specific evidence citations
+4. Provide clear rationale with specific evidence citations, citing evidence by the number shown in Evidence Found
 
 ## Decision Framework
 
@@ -1,158 +1,201 @@
-import json
-from .state import DenialEvaluatorState
+import heapq
+from functools import lru_cache
+from typing import Iterator, List, Union
+import orjson
+from .state import DenialCategory, DenialEvaluatorState, Evidence
+
+# Evidence shown to the reasoning agent: low-relevance items are dropped and large sets trimmed to the most relevant
+MAX_REASONING_EVIDENCE = 40
+MIN_REASONING_RELEVANCE = 0.2
+
+
+@lru_cache(maxsize=len(DenialCategory) + 1)
+def _category_line(category: Union[DenialCategory, str]) -> str:
+    """Render the category line shared by the gap analysis and reasoning prompts.
+
+    Uses the enum value so the text does not depend on the Python version's
+    str-enum formatting.
+    """
+    value = category.value if isinstance(category, DenialCategory) else category
+    return f"- Category: {value}"
+
+
+def _reasoning_evidence_indices(evidence: List[Evidence]) -> List[int]:
+    """Return the indices of evidence worth showing the reasoning agent, in their original order."""
+    indices = [i for i, e in enumerate(evidence) if e.relevance >= MIN_REASONING_RELEVANCE]
+    if len(indices) > MAX_REASONING_EVIDENCE:
+        indices = sorted(heapq.nlargest(MAX_REASONING_EVIDENCE, indices, key=lambda i: evidence[i].relevance))
+    return indices
 
-def build_categorizer_user_prompt(state: DenialEvaluatorState) -> str:
-    """Build user prompt for the categorizer agent."""
-    parts = []
 
+def _categorizer_sections(state: DenialEvaluatorState) -> Iterator[str]:
+    """Yield the populated sections of the categorizer prompt."""
     # Denial information
     if state.get("denial_details"):
         denial = state["denial_details"]
-        parts.append(f"""## Denial Information
+        yield f"""## Denial Information
 - Denial Reason: {denial.denial_reason or 'Not provided'}
-- Decision Details: {json.dumps(denial.decision_details) if denial.decision_details else 'Not provided'}""")
+- Decision Details: {denial.decision_details_json or 'Not provided'}"""
 
     # Service information
     if state.get("service_details"):
         service = state["service_details"]
-        parts.append(f"""## Service Information
+        yield f"""## Service Information
 - CPT Codes: {service.cpt_codes}
 - HCPCS Codes: {service.hcpcs_codes}
 - Diagnosis Codes (ICD-10): {service.dx_codes}
 - Site of Service: {service.site_of_service}
-- Urgency Level: {service.urgency_level}""")
+- Urgency Level: {service.urgency_level}"""
 
     # Clinical context
     if state.get("clinical_context"):
         clinical = state["clinical_context"]
-        parts.append(f"""## Clinical Context
+        yield f"""## Clinical Context
 - Primary Diagnosis: {clinical.primary_diagnosis}
 - Supporting Diagnoses: {clinical.supporting_diagnoses}
 - Relevant History: {clinical.relevant_history}
 - Prior Treatments: {clinical.prior_treatments}
-- Clinical Notes: {clinical.clinical_notes}""")
+- Clinical Notes: {clinical.clinical_notes}"""
 
-    return "Categorize this PA denial:\n\n" + "\n\n".join(parts)
 
+def build_categorizer_user_prompt(state: DenialEvaluatorState) -> str:
+    """Build user prompt for the categorizer agent."""
+    return "Categorize this PA denial:\n\n" + "\n\n".join(_categorizer_sections(state))
 
-def build_gap_analysis_user_prompt(state: DenialEvaluatorState) -> str:
-    """Build user prompt for the gap analysis agent."""
-    parts = []
 
+def _gap_analysis_sections(state: DenialEvaluatorState) -> Iterator[str]:
+    """Yield the populated sections of the gap analysis prompt."""
     # Categorization result
-    parts.append(f"""## Denial Categorization
-- Category: {state.get("category", "Unknown")}
-- Root Cause: {state.get("root_cause", "Unknown")}""")
+    yield f"""## Denial Categorization
+{_category_line(state.get("category", "Unknown"))}
+- Root Cause: {state.get("root_cause", "Unknown")}"""
 
     # Denial details
     if state.get("denial_details"):
         denial = state["denial_details"]
-        parts.append(f"""## Original Denial
+        yield f"""## Original Denial
 - Reason: {denial.denial_reason or 'Not provided'}
-- Details: {json.dumps(denial.decision_details) if denial.decision_details else 'Not provided'}""")
+- Details: {denial.decision_details_json or 'Not provided'}"""
 
     # Service information for policy lookup
     if state.get("service_details"):
         service = state["service_details"]
-        parts.append(f"""## Service Details (for policy lookup)
+        yield f"""## Service Details (for policy lookup)
 - CPT Codes: {service.cpt_codes}
 - HCPCS Codes: {service.hcpcs_codes}
-- Diagnosis Codes: {service.dx_codes}""")
+- Diagnosis Codes: {service.dx_codes}"""
 
-    return "Analyze gaps and create evidence search plan:\n\n" + "\n\n".join(parts)
-
-
-def build_evidence_gatherer_user_prompt(state: DenialEvaluatorState) -> str:
-    """Build user prompt for the evidence gatherer agent."""
-    parts = []
 
-    # What we're looking for
-    parts.append(f"""## Evidence Requirements
-{chr(10).join(f"- {e}" for e in state.get("required_evidence", []))}""")
-
-    # Search plan
-    parts.append(f"""## Search Plan
-{chr(10).join(f"{i+1}. {step}" for i, step in enumerate(state.get("search_plan", [])))}""")
+def build_gap_analysis_user_prompt(state: DenialEvaluatorState) -> str:
+    """Build user prompt for the gap analysis agent."""
+    return "Analyze gaps and create evidence search plan:\n\n" + "\n\n".join(_gap_analysis_sections(state))
 
-    # Policy references to validate against
-    if state.get("policy_references"):
-        parts.append(f"""## Policy References
-{chr(10).join(f"- {ref}" for ref in state["policy_references"])}""")
 
-    # Context for searches
+def _evidence_gatherer_sections(state: DenialEvaluatorState) -> Iterator[str]:
+    """Yield the populated sections of the evidence gatherer prompt."""
+    # Case context first: it is identical across revision passes, keeping the prompt prefix cacheable
     if state.get("service_details"):
         service = state["service_details"]
-        parts.append(f"""## Search Context
+        yield f"""## Search Context
 - CPT Codes: {service.cpt_codes}
 - Diagnosis Codes: {service.dx_codes}
-- Service Period: {service.service_start_date} to {service.service_end_date}""")
+- Service Period: {service.service_start_date} to {service.service_end_date}"""
 
     if state.get("clinical_context"):
         clinical = state["clinical_context"]
-        parts.append(f"""## Clinical Context
+        yield f"""## Clinical Context
 - Primary Diagnosis: {clinical.primary_diagnosis}
 - Supporting Diagnoses: {clinical.supporting_diagnoses}
 - Relevant History: {clinical.relevant_history}
 - Prior Treatments: {clinical.prior_treatments}
-- Clinical Notes: {clinical.clinical_notes}""")
-
-    return "Gather evidence following the search plan:\n\n" + "\n\n".join(parts)
+- Clinical Notes: {clinical.clinical_notes}"""
 
+    if state.get("prefetched_records"):
+        yield f"""## Prefetched Records
+{orjson.dumps(state["prefetched_records"], default=str).decode()}"""
 
-def build_reasoning_user_prompt(state: DenialEvaluatorState) -> str:
-    """Build user prompt for the reasoning agent."""
-    parts = []
-
-    # Denial summary
-    parts.append(f"""## Denial Summary
-- Category: {state.get("category", "Unknown")}
-- Root Cause: {state.get("root_cause", "Unknown")}""")
+    # What we're looking for
+    requirements_text = "\n".join(f"- {e}" for e in state.get("required_evidence", []))
+    yield f"""## Evidence Requirements
+{requirements_text}"""
 
-    if state.get("denial_details"):
-        denial = state["denial_details"]
-        parts.append(f"- Original Reason: {denial.denial_reason}")
+    # Search plan
+    plan_text = "\n".join(f"{i+1}. {step}" for i, step in enumerate(state.get("search_plan", [])))
+    yield f"""## Search Plan
+{plan_text}"""
 
-    if state.get("cliniclinical_context"):
-        parts.append(f"""## Clinical Context already shared with payer
-- Relevant History: {state["clinical_context"].relevant_history}
-- Prior Treatments: {state["clinical_context"].prior_treatments}
-- Clinical Notes: {state["clinical_context"].clinical_notes}""")
+    # Policy references to validate against
+    if state.get("policy_references"):
+        references_text = "\n".join(f"- {ref}" for ref in state["policy_references"])
+        yield f"""## Policy References
+{references_text}"""
 
 
-    if state.get("documents_shared"):
-        parts.append(f"""## Documents already shared with payer
-{chr(10).join(f"{doc.document_id}- {doc.title}" for doc in state["documents_shared"])}""")
+def build_evidence_gatherer_user_prompt(state: DenialEvaluatorState) -> str:
+    """Build user prompt for the evidence gatherer agent."""
+    return "Gather evidence following the search plan:\n\n" + "\n\n".join(_evidence_gatherer_sections(state))
 
-    # Evidence found
-    if state.get("found_evidence"):
-        evidence_items = []
-        for e in state["found_evidence"]:
-            evidence_items.append(f"  - [{e.evidence_type}] {e.fact} (Source: {e.source}, Relevance: {e.relevance})")
-        parts.append(f"""## Evidence Found
-{chr(10).join(evidence_items)}""")
 
-    # Missing evidence
-    if state.get("missing_evidence"):
-        parts.append(f"""## Missing Evidence
-{chr(10).join(f"- {m}" for m in state["missing_evidence"])}""")
+def _reasoning_sections(state: DenialEvaluatorState) -> Iterator[str]:
+    """Yield the populated sections of the reasoning prompt."""
+    # Denial summary
+    yield f"""## Denial Summary
+{_category_line(state.get("category", "Unknown"))}
+- Root Cause: {state.get("root_cause", "Unknown")}"""
 
-    # Policy references
-    if state.get("policy_references"):
-        parts.append(f"""## Applicable Policy References
-{chr(10).join(f"- {ref}" for ref in state["policy_references"])}""")
+    if state.get("denial_details"):
+        denial = state["denial_details"]
+        yield f"- Original Reason: {denial.denial_reason}"
 
-    # Service details for context
+    # Case-stable context ahead of the evidence sections, which change between revision passes
     if state.get("service_details"):
         service = state["service_details"]
-        parts.append(f"""
-## Service Information
+        yield f"""## Service Information
 - CPT Codes: {service.cpt_codes}
 - HCPCS Codes: {service.hcpcs_codes}
 - Diagnosis Codes (ICD-10): {service.dx_codes}
 - Site of Service: {service.site_of_service}
 - Requested Units: {service.requested_units}
 - Service Period: {service.service_start_date} to {service.service_end_date}
-- Urgency Level: {service.urgency_level}
-""")
+- Urgency Level: {service.urgency_level}"""
+
+    if state.get("clinical_context"):
+        clinical = state["clinical_context"]
+        yield f"""## Clinical Context already shared with payer
+- Relevant History: {clinical.relevant_history}
+- Prior Treatments: {clinical.prior_treatments}
+- Clinical Notes: {clinical.clinical_notes}"""
+
+    if state.get("documents_shared"):
+        documents_text = "\n".join(f"{doc.document_id}- {doc.title}" for doc in state["documents_shared"])
+        yield f"""## Documents already shared with payer
+{documents_text}"""
+
+    # Policy references (fixed once gap analysis has run)
+    if state.get("policy_references"):
+        references_text = "\n".join(f"- {ref}" for ref in state["policy_references"])
+        yield f"""## Applicable Policy References
+{references_text}"""
 
-    return "Analyze evidence and recommend action:\n\n" + "\n\n".join(parts)
+    # Evidence found
+    # Numbered by position in found_evidence so citations stay valid after filtering
+    evidence = state.get("found_evidence")
+    evidence_indices = _reasoning_evidence_indices(evidence) if evidence else None
+    if evidence_indices:
+        evidence_text = "\n".join(
+            f"  {i}. [{evidence[i].evidence_type}] {evidence[i].fact} (Source: {evidence[i].source}, Relevance: {evidence[i].relevance})"
+            for i in evidence_indices
+        )
+        yield f"""## Evidence Found
+{evidence_text}"""
+
+    # Missing evidence
+    if state.get("missing_evidence"):
+        missing_text = "\n".join(f"- {m}" for m in state["missing_evidence"])
+        yield f"""## Missing Evidence
+{missing_text}"""
+
+
+def build_reasoning_user_prompt(state: DenialEvaluatorState) -> str:
+    """Build user prompt for the reasoning agent."""
+    return "Analyze evidence and recommend action:\n\n" + "\n\n".join(_reasoning_sections(state))
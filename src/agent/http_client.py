@@ -0,0 +1,51 @@
+"""HTTP client shared by every OpenAI chat model in the PA agents."""
+
+import asyncio
+import weakref
+
+import httpx
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """Keeps a separate connection pool for each event loop.
+
+    Pooled connections belong to the loop that opened them, so a later
+    asyncio.run (or a fresh pytest loop) gets its own pool instead of
+    reusing connections from a closed loop.
+    """
+
+    def __init__(self, limits: httpx.Limits):
+        self._limits = limits
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the running loop's pool; pools of other loops are untouched."""
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+_transport = _PerLoopTransport(httpx.Limits(max_connections=100, max_keepalive_connections=50))
+
+# One client for all agents, so concurrent requirement items and denial stages reuse
+# warm keep-alive connections instead of opening a pool per model. The client itself
+# holds no loop state; connections live in the per-loop pools of its transport.
+# Per-request timeouts are still set by each ChatOpenAI's own `timeout`.
+shared_async_http_client = httpx.AsyncClient(transport=_transport, timeout=httpx.Timeout(60.0))
+
+
+async def close_shared_http_client() -> None:
+    """Close the running loop's connections; the client stays usable from later loops."""
+    await _transport.aclose()
@@ -1,7 +1,8 @@
 """Requirement handler agent."""
 
 from .agent import (
-    handle_requirements
+    handle_requirements,
+    stream_requirements
 )
 
 from .state import (
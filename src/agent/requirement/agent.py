@@ -1,24 +1,36 @@
 """LangGraph agent for handling Requirement."""
 
-from typing import Literal, List, Dict
-import uuid
-from datetime import datetime
-from langchain_core.messages import SystemMessage, HumanMessage
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
+import json
+from collections import Counter
+import logging
+import os
+import weakref
+from functools import lru_cache
+import openai
+from langchain_core.messages import AIMessage, AnyMessage, RemoveMessage, SystemMessage, HumanMessage, ToolMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 from langgraph.types import Send
-from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.runtime import Runtime
+from pydantic import ValidationError
 
 
+from ..http_client import shared_async_http_client
+from .cache import GathererResultCache, ParsedRequirementCache
 from .state import (
     GathererState,
+    GathererBatchState,
     RequirementAgentState,
     RequireItem,
     ParsedRequireItem,
     ParsedRequireItemList,
     RequireItemStatus,
     GathererResult,
+    GathererBatchResult,
     EvaluatorVerdict,
     RequireItemResult,
 )
@@ -26,62 +38,348 @@ from .system_prompts import (
     PARSER_SYSTEM_PROMPT,
     GATHERER_SYSTEM_PROMPT,
     GATHERER_DECISION_PROMPT,
+    BATCH_GATHERER_SYSTEM_PROMPT,
     EVALUATOR_SYSTEM_PROMPT,
 )
 from .user_prompts_builder import (
+    build_case_context,
+    build_case_context_prompt,
     build_parser_user_prompt,
     build_gatherer_user_prompt,
+    build_batch_gatherer_user_prompt,
     build_evaluator_user_prompt,
 )
-from ...tools import search_patient_documents, get_patient_health_record, get_procedure_details
+from ...tools import search_patient_documents, find_patient_documents, get_patient_health_record, get_procedure_details
 from ...models.core import ServiceInfo, ClinicalContext
+from ...models.document import DocumentType
+
+
+logger = logging.getLogger(__name__)
 
 
 # Console output helper
-def log_requirement(message: str) -> None:
-    """Print formatted status message for requirement gathering."""
-    print(f"   ├─ Requirement Gathering Agent: {message}")
+def log_requirement(message: str, *args) -> None:
+    """Log formatted status message for requirement gathering; args are %-formatted only when INFO is on."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("   ├─ Requirement Gathering Agent: %s", message % args if args else message)
 
 
-REQUIREMENT_HANDLER_TOOLS = [
+REQUIREMENT_HANDLER_TOOLS = (
     search_patient_documents,
     get_patient_health_record,
     get_procedure_details,
-]
+)
+
+# Repeated identical tool calls after which the gatherer is made to decide
+MAX_DUPLICATE_TOOL_CALLS = 2
+
+# Static system messages, shared across invocations so every request sends a byte-identical prefix
+_PARSER_SYSTEM_MESSAGE = SystemMessage(content=PARSER_SYSTEM_PROMPT)
+_GATHERER_SYSTEM_MESSAGE = SystemMessage(content=GATHERER_SYSTEM_PROMPT)
+_BATCH_GATHERER_SYSTEM_MESSAGE = SystemMessage(content=BATCH_GATHERER_SYSTEM_PROMPT)
+_EVALUATOR_SYSTEM_MESSAGE = SystemMessage(content=EVALUATOR_SYSTEM_PROMPT)
+_GATHERER_DECISION_MESSAGE = HumanMessage(content=GATHERER_DECISION_PROMPT)
+
+# Items sharing a document type are searched together once a group is this large
+BATCH_GATHER_MIN_ITEMS = 3
+# Larger groups are split into even batches of at most this many items to keep each answer focused
+BATCH_GATHER_MAX_ITEMS = 5
+
+
+def _split_batch(items: List[ParsedRequireItem]) -> List[List[ParsedRequireItem]]:
+    """Split items into the fewest near-equal batches of at most BATCH_GATHER_MAX_ITEMS."""
+    count = -(-len(items) // BATCH_GATHER_MAX_ITEMS)
+    return [items[i * len(items) // count:(i + 1) * len(items) // count] for i in range(count)]
+
+# Tool results from earlier search turns are clipped to this many characters in the gatherer prompt
+MAX_EARLIER_TOOL_RESULT_CHARS = 4000
+
+# Search turns kept verbatim in the gatherer history; older turns are folded into summary messages
+KEEP_RECENT_TOOL_TURNS = 3
+# Turns folded into each summary; folding whole blocks leaves the prompt prefix unchanged between prunes
+SUMMARIZE_TOOL_TURNS_BLOCK = 3
+MAX_SUMMARIZED_TOOL_RESULT_CHARS = 300
+_SEARCH_SUMMARY_HEADER = "Summary of earlier searches (full results no longer shown):"
+
+# Items gathered at once across all runs on a loop; size it to the model tier's rate limits
+MAX_CONCURRENT_GATHERERS = int(os.getenv("REQ_GATHER_CONCURRENCY", "32"))
+# A semaphore binds to the loop that first waits on it, so each loop gets its own
+_gather_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _gather_semaphore() -> asyncio.Semaphore:
+    """Semaphore limiting concurrent gatherers on the running loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _gather_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _gather_semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_GATHERERS)
+    return semaphore
+
+
+_parsed_requirement_cache = ParsedRequirementCache()
+_gatherer_result_cache = GathererResultCache()
+# Only confident, satisfied results are reused; anything else is searched again on the next run
+MIN_CACHED_GATHER_CONFIDENCE = 0.8
+# In-flight parser calls, so concurrent runs with the same items share one LLM call
+_pending_parses: Dict[str, asyncio.Future] = {}
+
+
+# Transient OpenAI failures are retried with jittered exponential backoff, so a burst of 429s
+# during the item fan-out delays an item instead of discarding its earlier tool calls
+_RETRYABLE_LLM_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+LLM_RETRY_ATTEMPTS = 6
+
+
+def _with_llm_retry(runnable: Runnable) -> Runnable:
+    return runnable.with_retry(
+        retry_if_exception_type=_RETRYABLE_LLM_ERRORS,
+        wait_exponential_jitter=True,
+        exponential_jitter_params={"initial": 1, "max": 30},
+        stop_after_attempt=LLM_RETRY_ATTEMPTS,
+    )
+
+
+def _tool_call_key(tool_call: dict) -> str:
+    return f"{tool_call['name']}:{json.dumps(tool_call['args'], sort_keys=True, default=str)}"
+
+
+# Recorded for results accepted without running the evaluator
+_SETTLED_VERDICT = EvaluatorVerdict(
+    satisfies_request=True,
+    reasoning="Accepted without evaluation: found with high confidence and supporting evidence",
+    gaps=[],
+    suggestions=[],
+)
+
+
+def _is_settled(result: GathererResult) -> bool:
+    """A found result confident and supported enough to accept without evaluation."""
+    return (
+        result.status == RequireItemStatus.FOUND
+        and result.confidence >= 0.9
+        and len(result.supporting_evidence) >= 2
+    )
+
+
+def _clip_earlier_tool_results(messages: List[AnyMessage]) -> List[AnyMessage]:
+    """Clip long tool results from all but the latest tool turn.
+
+    Each result is clipped the same way on every later turn, so the prompt
+    prefix stays byte-identical for provider prompt caching.
+    """
+    latest_turn = max((i for i, m in enumerate(messages) if getattr(m, "tool_calls", None)), default=-1)
+    return [
+        message.model_copy(update={
+            "content": message.content[:MAX_EARLIER_TOOL_RESULT_CHARS] + " ...[clipped, see earlier search]"
+        })
+        if (
+            i < latest_turn
+            and isinstance(message, ToolMessage)
+            and isinstance(message.content, str)
+            and len(message.content) > MAX_EARLIER_TOOL_RESULT_CHARS
+        )
+        else message
+        for i, message in enumerate(messages)
+    ]
+
+
+# Stand-ins for items that never got a gatherer result or verdict
+_EMPTY_GATHERER = GathererResult(
+    status=RequireItemStatus.NOT_FOUND,
+    search_summary="",
+    supporting_evidence=[],
+    justification="",
+    confidence=0.0
+)
+_EMPTY_VERDICT = EvaluatorVerdict(satisfies_request=False, reasoning="")
+
+
+def _failed_verdict(error: Exception) -> EvaluatorVerdict:
+    return EvaluatorVerdict(
+        satisfies_request=False,
+        reasoning=f"Automatic search failed: {type(error).__name__}",
+        gaps=["Automatic search failed; information must be provided manually"],
+    )
+
+
+def _build_item_result(
+    item: ParsedRequireItem,
+    gatherer: Optional[GathererResult],
+    verdict: Optional[EvaluatorVerdict]
+) -> RequireItemResult:
+    gatherer = gatherer or _EMPTY_GATHERER
+    return RequireItemResult(
+        item_id=item.item_id,
+        original_request=item.original_request,
+        optional=item.optional,
+        status=gatherer.status,
+        documents=gatherer.found_documents,
+        information=gatherer.found_information,
+        supporting_evidence=gatherer.supporting_evidence,
+        gaps=(verdict or _EMPTY_VERDICT).gaps
+    )
+
+
+def _is_search_summary(message: AnyMessage) -> bool:
+    return isinstance(message, HumanMessage) and message.content.startswith(_SEARCH_SUMMARY_HEADER)
+
+
+def _summarize_search_turns(messages: List[AnyMessage]) -> str:
+    """Fold tool calls and their clipped results into summary lines."""
+    tool_calls = {
+        tool_call["id"]: tool_call
+        for message in messages if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+    }
+    lines = [_SEARCH_SUMMARY_HEADER]
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            tool_call = tool_calls.get(message.tool_call_id)
+            call = _tool_call_key(tool_call) if tool_call else message.name
+            lines.append(f"- {call} -> {str(message.content)[:MAX_SUMMARIZED_TOOL_RESULT_CHARS]}")
+    return "\n".join(lines)
+
+
+DEFAULT_MODEL_ID = "gpt-4o"
+
+# Items with a known document type and at most this many keywords count as simple
+# and may be gathered by a cheaper model
+SIMPLE_ITEM_MAX_KEYWORDS = 3
+
+
+def _is_simple_item(item: ParsedRequireItem) -> bool:
+    return item.document_type is not None and len(item.keywords) <= SIMPLE_ITEM_MAX_KEYWORDS
+
+
+def _case_context_messages(state: GathererState) -> List[HumanMessage]:
+    """Leading case context message, kept apart from the per-item prompt so it stays a shared prefix."""
+    case_context = build_case_context_prompt(state)
+    return [HumanMessage(content=case_context)] if case_context else []
+
+
+@lru_cache(maxsize=8)
+def _get_chat_model(model_id: str) -> ChatOpenAI:
+    # Retries are handled by _with_llm_retry; the timeout bounds each attempt
+    return ChatOpenAI(model=model_id, timeout=60, max_retries=0, http_async_client=shared_async_http_client)
 
 
 def create_gatherer_subgraph(llm: ChatOpenAI):
     """Create the gatherer subgraph with isolated state per Require item."""
+
+    # The tool loop and the decision call share the system prompt and case context prefix, so they share a cache key
+    llm_with_tools = _with_llm_retry(llm.bind_tools(
+        [*REQUIREMENT_HANDLER_TOOLS, GathererResult], prompt_cache_key="pa-requirement-gatherer"
+    ))
+    gatherer_structured_llm = _with_llm_retry(llm.with_structured_output(
+        GathererResult, method="json_schema", prompt_cache_key="pa-requirement-gatherer"
+    ))
+    evaluator_structured_llm = _with_llm_retry(llm.with_structured_output(
+        EvaluatorVerdict, method="json_schema", prompt_cache_key="pa-requirement-evaluator"
+    ))
     
     async def gather_information_node(state: GathererState) -> dict:
         """Gatherer agent searches for information using tools."""
         parsed_require_item: ParsedRequireItem = state["parsed_require_item"]
-        log_requirement(f"Searching for: {parsed_require_item.original_request[:50]}...")
+        log_requirement("Searching for: %s...", parsed_require_item.original_request[:50])
         
-        user_prompt = build_gatherer_user_prompt(state)
+        user_prompt = build_gatherer_user_prompt(parsed_require_item)
         messages = [
-            SystemMessage(content=GATHERER_SYSTEM_PROMPT),
-            HumanMessage(content=user_prompt)
-        ] + state["messages"]
+            _GATHERER_SYSTEM_MESSAGE,
+            *_case_context_messages(state),
+            HumanMessage(content=user_prompt),
+            *_clip_earlier_tool_results(state["messages"])
+        ]
         
-        llm_with_tools = llm.bind_tools(REQUIREMENT_HANDLER_TOOLS)
         response = await llm_with_tools.ainvoke(messages)
+
+        # A submitted result is parsed locally, saving the separate decision call
+        for tool_call in response.tool_calls:
+            if tool_call["name"] == GathererResult.__name__:
+                try:
+                    gather_result = GathererResult(**tool_call["args"])
+                except ValidationError:
+                    # Every call is answered so the history stays valid; the decision call then asks for a schema-bound result
+                    log_requirement("Submitted result was malformed, deciding with gathered data")
+                    return {"messages": [response, *(
+                        ToolMessage(
+                            content="Not run: the submitted GathererResult did not match its schema.",
+                            tool_call_id=call["id"],
+                            name=call["name"],
+                        )
+                        for call in response.tool_calls
+                    )]}
+                return {"messages": [response], "gather_result": gather_result}
+
         return {"messages": [response]}
     
     tool_node = ToolNode(REQUIREMENT_HANDLER_TOOLS)
+
+    async def run_tools_node(state: GathererState, config: RunnableConfig) -> dict:
+        """Run requested tools, suppressing calls already made with the same arguments."""
+        last_message = state["messages"][-1]
+        seen_keys = set(state.get("tool_call_keys", []))
+
+        new_calls, new_keys, duplicate_messages = [], [], []
+        for tool_call in last_message.tool_calls:
+            key = _tool_call_key(tool_call)
+            if key in seen_keys:
+                duplicate_messages.append(ToolMessage(
+                    content="Duplicate call suppressed: this tool was already called with the same arguments, use the earlier result.",
+                    tool_call_id=tool_call["id"],
+                    name=tool_call["name"],
+                ))
+                continue
+            seen_keys.add(key)
+            new_calls.append(tool_call)
+            new_keys.append(key)
+
+        tool_messages = []
+        if new_calls:
+            result = await tool_node.ainvoke(
+                {"messages": [last_message.model_copy(update={"tool_calls": new_calls})]},
+                config=config
+            )
+            tool_messages = result["messages"]
+
+        return {
+            "messages": tool_messages + duplicate_messages,
+            "tool_call_keys": new_keys,
+            "duplicate_tool_calls": state.get("duplicate_tool_calls", 0) + len(duplicate_messages),
+        }
     
+    def prune_history_node(state: GathererState) -> dict:
+        """Fold a block of older search turns into a summary message once enough have piled up.
+
+        Summaries are written once and never rewritten, so earlier summaries stay a stable prefix.
+        """
+        messages = state["messages"]
+        first_unsummarized = max((i + 1 for i, message in enumerate(messages) if _is_search_summary(message)), default=0)
+        turn_starts = [
+            i for i, message in enumerate(messages[first_unsummarized:], first_unsummarized)
+            if getattr(message, "tool_calls", None)
+        ]
+        if len(turn_starts) < KEEP_RECENT_TOOL_TURNS + SUMMARIZE_TOOL_TURNS_BLOCK:
+            return {}
+
+        block = messages[first_unsummarized:turn_starts[-KEEP_RECENT_TOOL_TURNS]]
+        # Reusing the block's first message id replaces it in place, after any earlier summaries
+        summary = HumanMessage(content=_summarize_search_turns(block), id=block[0].id)
+        return {"messages": [summary, *(RemoveMessage(id=message.id) for message in block[1:])]}
+
     async def gather_decision_node(state: GathererState) -> dict:
         """Gatherer produces structured result after searching."""
-        user_prompt = build_gatherer_user_prompt(state)
+        user_prompt = build_gatherer_user_prompt(state["parsed_require_item"])
         
         messages = [
-            SystemMessage(content=GATHERER_SYSTEM_PROMPT),
-            HumanMessage(content=user_prompt)
-        ] + state["messages"] + [
-            HumanMessage(content=GATHERER_DECISION_PROMPT)
+            _GATHERER_SYSTEM_MESSAGE,
+            *_case_context_messages(state),
+            HumanMessage(content=user_prompt),
+            *state["messages"],
+            _GATHERER_DECISION_MESSAGE
         ]
 
-        gatherer_structured_llm = llm.with_structured_output(GathererResult)
         result = await gatherer_structured_llm.ainvoke(messages)
         
         return {"gather_result": result}
@@ -90,25 +388,41 @@ def create_gatherer_subgraph(llm: ChatOpenAI):
         """Evaluate if gathered data satisfies the Requirement request."""
         gatherer_result: GathererResult = state["gather_result"]
         
-        user_prompt = build_evaluator_user_prompt(state, gatherer_result)
+        user_prompt = build_evaluator_user_prompt(state["parsed_require_item"], gatherer_result)
         messages = [
-            SystemMessage(content=EVALUATOR_SYSTEM_PROMPT),
+            _EVALUATOR_SYSTEM_MESSAGE,
+            *_case_context_messages(state),
             HumanMessage(content=user_prompt)
         ]
         
-        evaluator_structured_llm = llm.with_structured_output(EvaluatorVerdict)
         verdict = await evaluator_structured_llm.ainvoke(messages)
                 
         return {"evaluator_verdict": verdict}
     
-    def route_after_gather(state: GathererState) -> Literal["tools", "gather_decision"]:
+    def route_after_result(state: GathererState) -> str:
+        """Skip the evaluator when the gatherer is confident and well supported."""
+        if _is_settled(state["gather_result"]):
+            return END
+        return "evaluator"
+
+    def route_after_tools(state: GathererState) -> str:
+        """Stop searching once the gatherer keeps repeating the same calls."""
+        if state.get("duplicate_tool_calls", 0) >= MAX_DUPLICATE_TOOL_CALLS:
+            log_requirement("Search has converged, deciding with gathered data")
+            return "gather_decision"
+        return "gather_information"
+
+    def route_after_gather(state: GathererState) -> str:
         """Route after gatherer - check if tools need to be called."""
+        if state.get("gather_result"):
+            return route_after_result(state)
+
         messages = state["messages"]
         if not messages:
             return "gather_decision"
         last_message = messages[-1]
         
-        if hasattr(last_message, "tool_calls") and last_message.tool_calls:
+        if getattr(last_message, "tool_calls", None):
             return "tools"
         
         return "gather_decision"
@@ -117,7 +431,8 @@ def create_gatherer_subgraph(llm: ChatOpenAI):
     subgraph = StateGraph(GathererState)
     
     subgraph.add_node("gather_information", gather_information_node)
-    subgraph.add_node("tools", tool_node)
+    subgraph.add_node("tools", run_tools_node)
+    subgraph.add_node("prune_history", prune_history_node)
     subgraph.add_node("gather_decision", gather_decision_node)
     subgraph.add_node("evaluator", evaluator_node)
     
@@ -126,71 +441,202 @@ def create_gatherer_subgraph(llm: ChatOpenAI):
     subgraph.add_conditional_edges(
         "gather_information",
         route_after_gather,
-        {"tools": "tools", "gather_decision": "gather_decision"}
+        {"tools": "tools", "gather_decision": "gather_decision", "evaluator": "evaluator", END: END}
     )
-    subgraph.add_edge("tools", "gather_information")
-    subgraph.add_edge("gather_decision", "evaluator")
+    subgraph.add_edge("tools", "prune_history")
+    subgraph.add_conditional_edges("prune_history", route_after_tools, ["gather_information", "gather_decision"])
+    subgraph.add_conditional_edges("gather_decision", route_after_result, ["evaluator", END])
     subgraph.add_edge("evaluator", END)
     
     return subgraph.compile()
 
 
-def create_requirement_handler_agent(model_id: str = "gpt-4o"):
-    """Create the Requirement handler LangGraph agent."""
+@lru_cache(maxsize=8)
+def _get_gatherer_subgraph(model_id: str):
+    return create_gatherer_subgraph(_get_chat_model(model_id))
+
+
+def create_requirement_handler_agent(model_id: str = DEFAULT_MODEL_ID, simple_item_model_id: Optional[str] = None):
+    """Create the Requirement handler LangGraph agent.
+
+    When simple_item_model_id is given, simple items are gathered with that model instead.
+    """
     
-    llm = ChatOpenAI(model=model_id)
-    gatherer_subgraph = create_gatherer_subgraph(llm)
+    llm = _get_chat_model(model_id)
+    gatherer_subgraph = _get_gatherer_subgraph(model_id)
+    simple_gatherer_subgraph = _get_gatherer_subgraph(simple_item_model_id) if simple_item_model_id else gatherer_subgraph
+    parser_llm = _with_llm_retry(llm.with_structured_output(ParsedRequireItemList, method="json_schema"))
+    batch_gatherer_llm = _with_llm_retry(llm.with_structured_output(GathererBatchResult, method="json_schema"))
     
-    # Node 1: Parse Requirement items
-    async def parse_requirement_node(state: RequirementAgentState) -> dict:
-        """Parse raw Requirement requests into structured items."""
-        require_items: List[RequireItem] = state["require_items"]
-        
+    async def parse_require_items(require_items: List[RequireItem], cache_key: str) -> ParsedRequireItemList:
         user_prompt = build_parser_user_prompt(require_items)
 
-        parser_llm = llm.with_structured_output(ParsedRequireItemList)
         parsed_require_items: ParsedRequireItemList = await parser_llm.ainvoke([
-            SystemMessage(content=PARSER_SYSTEM_PROMPT),
+            _PARSER_SYSTEM_MESSAGE,
             HumanMessage(content=user_prompt)
         ])
-        
+        _parsed_requirement_cache.set(cache_key, parsed_require_items)
+        return parsed_require_items
+
+    # Node 1: Parse Requirement items
+    async def parse_requirement_node(state: RequirementAgentState) -> dict:
+        """Parse raw Requirement requests into structured items."""
+        require_items: List[RequireItem] = state["require_items"]
+
+        cache_key = ParsedRequirementCache.make_key(require_items)
+        parsed_require_items = _parsed_requirement_cache.get(cache_key)
+        if parsed_require_items is not None:
+            log_requirement("Reusing cached parse of the requested items")
+            return {"parsed_require_items": parsed_require_items.items}
+
+        pending = _pending_parses.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(parse_require_items(require_items, cache_key))
+            _pending_parses[cache_key] = pending
+            pending.add_done_callback(lambda _: _pending_parses.pop(cache_key, None))
+
+        # Shielded so a cancelled run does not cancel the parse other runs are waiting on
+        parsed_require_items = await asyncio.shield(pending)
         return {
-            "parsed_require_items": parsed_require_items.items,
+            "parsed_require_items": parsed_require_items.model_copy(deep=True).items,
         }
 
-    async def process_require_item_node(state: GathererState, config: RunnableConfig) -> dict:
+    async def process_require_item_node(state: GathererState, config: RunnableConfig, runtime: Runtime) -> dict:
         """Process a single Require item through the gatherer subgraph."""
-        result = await gatherer_subgraph.ainvoke(state, config=config)
-        
         parsed_require_item: ParsedRequireItem = state["parsed_require_item"]
+        patient_id = runtime.context.get("patient_id")
+        cache_key = GathererResultCache.make_key(patient_id, parsed_require_item, state.get("service_details"))
+
+        cached = _gatherer_result_cache.get(cache_key) if patient_id else None
+        if cached is not None:
+            log_requirement("Reusing earlier result for: %s...", parsed_require_item.original_request[:50])
+            gather_result, verdict = cached
+        else:
+            subgraph = simple_gatherer_subgraph if _is_simple_item(parsed_require_item) else gatherer_subgraph
+            try:
+                async with _gather_semaphore():
+                    result = await subgraph.ainvoke(state, config=config)
+            except Exception as e:
+                # One failed item should not lose the results of the others; it surfaces as a gap for review
+                logger.exception("Gathering failed for requirement item %s", parsed_require_item.item_id)
+                return {
+                    "gatherer_results": [(parsed_require_item.item_id, _EMPTY_GATHERER)],
+                    "evaluator_verdicts": [(parsed_require_item.item_id, _failed_verdict(e))]
+                }
+
+            gather_result: GathererResult = result["gather_result"]
+            # The subgraph only ends without a verdict when the result was settled
+            verdict = result.get("evaluator_verdict") or _SETTLED_VERDICT
+            if patient_id and verdict.satisfies_request and gather_result.confidence >= MIN_CACHED_GATHER_CONFIDENCE:
+                _gatherer_result_cache.set(cache_key, gather_result, verdict)
+
+        return {
+            "gatherer_results": [(parsed_require_item.item_id, gather_result)],
+            "evaluator_verdicts": [(parsed_require_item.item_id, verdict)]
+        }
+
+    async def search_batch(state: GathererBatchState, patient_id: Optional[str]) -> Dict[str, GathererResult]:
+        """Search once for the batch's items; return the results it settles, keyed by item id."""
+        items: List[ParsedRequireItem] = state["parsed_require_items"]
+        document_type = items[0].document_type
+        log_requirement("Searching %s documents for %d items together...", document_type.value, len(items))
+
+        keywords = sorted({keyword for item in items for keyword in item.keywords})
+        try:
+            async with _gather_semaphore():
+                documents = []
+                if patient_id:
+                    documents = await asyncio.to_thread(find_patient_documents, patient_id, document_type, keywords or None)
+
+                response: GathererBatchResult = await batch_gatherer_llm.ainvoke([
+                    _BATCH_GATHERER_SYSTEM_MESSAGE,
+                    HumanMessage(content=build_batch_gatherer_user_prompt(state, documents))
+                ])
+        except Exception:
+            # Every item is still gathered on its own, so a failed batch only costs the saved calls
+            logger.exception("Batched gathering failed for %d %s items", len(items), document_type.value)
+            return {}
+
+        # Results for ids outside the batch, for ids answered twice, or citing documents
+        # that were never shown are not trusted
+        batch_ids = {item.item_id for item in items}
+        fetched_ids = {document["document_id"] for document in documents}
+        answer_counts = Counter(result.item_id for result in response.results)
         return {
-            "gatherer_results": {parsed_require_item.item_id: result["gather_result"]},
-            "evaluator_verdicts": {parsed_require_item.item_id: result["evaluator_verdict"]}
+            result.item_id: GathererResult(**result.model_dump(exclude={"item_id"}))
+            for result in response.results
+            if result.item_id in batch_ids
+            and answer_counts[result.item_id] == 1
+            and {document.document_id for document in result.found_documents} <= fetched_ids
+            and _is_settled(result)
+        }
+
+    async def process_require_item_batch_node(state: GathererBatchState, config: RunnableConfig, runtime: Runtime) -> dict:
+        """Search once for several items sharing a document type.
+
+        Cached items are reused, and items the batched answer does not settle
+        go through the per-item gatherer subgraph.
+        """
+        items: List[ParsedRequireItem] = state["parsed_require_items"]
+        patient_id = runtime.context.get("patient_id")
+
+        gatherer_results: List[Tuple[str, GathererResult]] = []
+        evaluator_verdicts: List[Tuple[str, EvaluatorVerdict]] = []
+        cache_keys = {
+            item.item_id: GathererResultCache.make_key(patient_id, item, state["service_details"])
+            for item in items
+        }
+        pending: List[ParsedRequireItem] = []
+        for item in items:
+            cached = _gatherer_result_cache.get(cache_keys[item.item_id]) if patient_id else None
+            if cached is None:
+                pending.append(item)
+                continue
+            log_requirement("Reusing earlier result for: %s...", item.original_request[:50])
+            gather_result, verdict = cached
+            gatherer_results.append((item.item_id, gather_result))
+            evaluator_verdicts.append((item.item_id, verdict))
+
+        settled: Dict[str, GathererResult] = {}
+        if len(pending) >= BATCH_GATHER_MIN_ITEMS:
+            settled = await search_batch({**state, "parsed_require_items": pending}, patient_id)
+        for item_id, gather_result in settled.items():
+            gatherer_results.append((item_id, gather_result))
+            evaluator_verdicts.append((item_id, _SETTLED_VERDICT))
+            if patient_id:
+                _gatherer_result_cache.set(cache_keys[item_id], gather_result, _SETTLED_VERDICT)
+
+        fallback_updates = await asyncio.gather(*(
+            process_require_item_node({
+                "parsed_require_item": item,
+                "service_details": state["service_details"],
+                "clinical_context": state["clinical_context"],
+                "case_context": state["case_context"],
+                "messages": []
+            }, config, runtime)
+            for item in pending
+            if item.item_id not in settled
+        ))
+        for update in fallback_updates:
+            gatherer_results += update["gatherer_results"]
+            evaluator_verdicts += update["evaluator_verdicts"]
+        return {
+            "gatherer_results": gatherer_results,
+            "evaluator_verdicts": evaluator_verdicts
         }
     
     # Node 7: Output - compile final result
     async def output_node(state: RequirementAgentState) -> dict:
         """Compile final Requirement response."""
         parsed_require_items: List[ParsedRequireItem] = state["parsed_require_items"]
-        gatherer_results: Dict[str, GathererResult] = state["gatherer_results"]
-        evaluator_verdicts: Dict[str, EvaluatorVerdict] = state["evaluator_verdicts"]
+        gatherer_results: Dict[str, GathererResult] = dict(state["gatherer_results"])
+        evaluator_verdicts: Dict[str, EvaluatorVerdict] = dict(state["evaluator_verdicts"])
         
         # Build item results
-        item_results = []
-        for item in parsed_require_items:
-            gatherer = gatherer_results.get(item.item_id, None)
-            verdict = evaluator_verdicts.get(item.item_id, None)
-                        
-            item_results.append(RequireItemResult(
-                item_id=item.item_id,
-                original_request=item.original_request,
-                optional=item.optional,
-                status=gatherer.status if gatherer else RequireItemStatus.NOT_FOUND,
-                documents=gatherer.found_documents if gatherer else [],
-                information=gatherer.found_information if gatherer else None,
-                supporting_evidence=gatherer.supporting_evidence if gatherer else [],
-                gaps=verdict.gaps if verdict else []
-            ))
+        item_results = [
+            _build_item_result(item, gatherer_results.get(item.item_id), evaluator_verdicts.get(item.item_id))
+            for item in parsed_require_items
+        ]
 
         return {
             "require_item_result": item_results,
@@ -199,14 +645,38 @@ def create_requirement_handler_agent(model_id: str = "gpt-4o"):
     
     # Routing logic
     def route_to_gather(state: RequirementAgentState):
+        # Case context is the same for every item, so render it once for all gatherer prompts
+        case_context = build_case_context(state)
+
+        by_document_type: Dict[DocumentType, List[ParsedRequireItem]] = {}
+        for item in state["parsed_require_items"]:
+            if item.document_type:
+                by_document_type.setdefault(item.document_type, []).append(item)
+        batches = [
+            batch
+            for items in by_document_type.values() if len(items) >= BATCH_GATHER_MIN_ITEMS
+            for batch in _split_batch(items)
+        ]
+        batched_ids = {item.item_id for items in batches for item in items}
+
         return [
+            Send("process_requirement_item_batch", {
+                "parsed_require_items": items,
+                "service_details": state["service_details"],
+                "clinical_context": state["clinical_context"],
+                "case_context": case_context,
+            })
+            for items in batches
+        ] + [
             Send("process_requirement_item", {
                 "parsed_require_item": item,
                 "service_details": state["service_details"],
                 "clinical_context": state["clinical_context"],
+                "case_context": case_context,
                 "messages": []
             }) 
             for item in state["parsed_require_items"]
+            if item.item_id not in batched_ids
         ]
     
     # Build the graph
@@ -215,21 +685,31 @@ def create_requirement_handler_agent(model_id: str = "gpt-4o"):
     # Add nodes
     workflow.add_node("parse_requirement", parse_requirement_node)
     workflow.add_node("process_requirement_item", process_require_item_node)
+    workflow.add_node("process_requirement_item_batch", process_require_item_batch_node)
     workflow.add_node("output", output_node)
     
     # Set entry point
     workflow.set_entry_point("parse_requirement")
     
     # Add edges
-    workflow.add_conditional_edges("parse_requirement", route_to_gather, ["process_requirement_item"])
+    workflow.add_conditional_edges(
+        "parse_requirement",
+        route_to_gather,
+        ["process_requirement_item", "process_requirement_item_batch"]
+    )
     workflow.add_edge("process_requirement_item", "output")
+    workflow.add_edge("process_requirement_item_batch", "output")
     workflow.add_edge("output", END)
     
     return workflow.compile()
 
-_requirement_agent = create_requirement_handler_agent()
+@lru_cache(maxsize=8)
+def get_requirement_agent(model_id: str = DEFAULT_MODEL_ID, simple_item_model_id: Optional[str] = None):
+    """Return the compiled Requirement agent for these models, compiling it on first use."""
+    return create_requirement_handler_agent(model_id, simple_item_model_id)
 
-async def handle_requirements(
+
+def _requirement_run_args(
     patient_id: str,
     pa_request_id: str,
     payer_id: str,
@@ -237,9 +717,7 @@ async def handle_requirements(
     require_items: List[RequireItem],
     service_details: ServiceInfo,
     clinical_context: ClinicalContext,
-) -> List[RequireItemResult]:
-
-
+) -> dict:
     initial_state = {
         "require_items": require_items,
         "service_details": service_details,
@@ -249,16 +727,60 @@ async def handle_requirements(
         "require_item_result": [],
         "processing_complete": False,
     }
-    
-    result = await _requirement_agent.ainvoke(
-        initial_state,
-        config=RunnableConfig(recursion_limit=50),
-        context={
+    return {
+        "input": initial_state,
+        "config": RunnableConfig(recursion_limit=50),
+        "context": {
             "patient_id": patient_id, 
             "pa_request_id": pa_request_id, 
             "payer_id": payer_id, 
             "plan_id": plan_id
         }
-    )
+    }
+
+
+async def handle_requirements(
+    patient_id: str,
+    pa_request_id: str,
+    payer_id: str,
+    plan_id: str,
+    require_items: List[RequireItem],
+    service_details: ServiceInfo,
+    clinical_context: ClinicalContext,
+    model_id: str = DEFAULT_MODEL_ID,
+    simple_item_model_id: Optional[str] = None,
+) -> List[RequireItemResult]:
+    """Gather all requirement items and return their results in request order."""
+    result = await get_requirement_agent(model_id, simple_item_model_id).ainvoke(**_requirement_run_args(
+        patient_id, pa_request_id, payer_id, plan_id, require_items, service_details, clinical_context
+    ))
     
     return result.get("require_item_result")
+
+
+async def stream_requirements(
+    patient_id: str,
+    pa_request_id: str,
+    payer_id: str,
+    plan_id: str,
+    require_items: List[RequireItem],
+    service_details: ServiceInfo,
+    clinical_context: ClinicalContext,
+    model_id: str = DEFAULT_MODEL_ID,
+    simple_item_model_id: Optional[str] = None,
+) -> AsyncIterator[RequireItemResult]:
+    """Yield each requirement item's result as soon as it is gathered, in completion order."""
+    parsed_require_items: Dict[str, ParsedRequireItem] = {}
+    async for update in get_requirement_agent(model_id, simple_item_model_id).astream(
+        **_requirement_run_args(
+            patient_id, pa_request_id, payer_id, plan_id, require_items, service_details, clinical_context
+        ),
+        stream_mode="updates"
+    ):
+        for node, values in update.items():
+            if node == "parse_requirement":
+                parsed_require_items = {item.item_id: item for item in values["parsed_require_items"]}
+            elif node in ("process_requirement_item", "process_requirement_item_batch"):
+                evaluator_verdicts = dict(values["evaluator_verdicts"])
+                for item_id, gatherer in values["gatherer_results"]:
+                    yield _build_item_result(parsed_require_items[item_id], gatherer, evaluator_verdicts.get(item_id))
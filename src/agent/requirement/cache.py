@@ -0,0 +1,71 @@
+"""Response caches for the requirement parser and gatherer."""
+
+from typing import List, Optional, Tuple
+
+from ..cache import TTLCache, make_cache_key
+from .state import EvaluatorVerdict, GathererResult, ParsedRequireItem, ParsedRequireItemList, RequireItem
+from ...models.core import ServiceInfo
+
+
+class ParsedRequirementCache:
+    """Caches parsed requirement lists by the raw requested items.
+
+    Parsing only looks at the item ids and request text, so recurring payer
+    requests reuse the same structured items.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 7 * 24 * 60 * 60):
+        self._cache: TTLCache[ParsedRequireItemList] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def make_key(require_items: List[RequireItem]) -> str:
+        return make_cache_key([(item.item_id, item.requested_item) for item in require_items])
+
+    def get(self, key: str) -> Optional[ParsedRequireItemList]:
+        cached = self._cache.get(key)
+        return cached.model_copy(deep=True) if cached is not None else None
+
+    def set(self, key: str, parsed: ParsedRequireItemList) -> None:
+        self._cache.set(key, parsed)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class GathererResultCache:
+    """Caches satisfied gatherer results and verdicts per patient and requirement.
+
+    Keys always include the patient, since results come from that patient's
+    records. Entries expire after an hour so newly filed documents are picked up.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl_seconds: float = 60 * 60):
+        self._cache: TTLCache[Tuple[GathererResult, EvaluatorVerdict]] = TTLCache(
+            maxsize=maxsize, ttl_seconds=ttl_seconds
+        )
+
+    @staticmethod
+    def make_key(patient_id: str, item: ParsedRequireItem, service: Optional[ServiceInfo]) -> str:
+        return make_cache_key(
+            patient_id,
+            item.original_request,
+            item.description,
+            item.document_type,
+            sorted(item.keywords),
+            sorted(service.cpt_codes) if service else [],
+            sorted(service.hcpcs_codes) if service else [],
+            sorted(service.dx_codes) if service else [],
+        )
+
+    def get(self, key: str) -> Optional[Tuple[GathererResult, EvaluatorVerdict]]:
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        gatherer_result, verdict = cached
+        return gatherer_result.model_copy(deep=True), verdict.model_copy(deep=True)
+
+    def set(self, key: str, gatherer_result: GathererResult, verdict: EvaluatorVerdict) -> None:
+        self._cache.set(key, (gatherer_result, verdict))
+
+    def clear(self) -> None:
+        self._cache.clear()
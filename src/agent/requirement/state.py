@@ -1,7 +1,8 @@
 """State schema for the Requirement handler agent."""
 
 import operator
-from typing import List, Optional, Dict, Any, Literal, Annotated, TypedDict
+from functools import cached_property
+from typing import List, Optional, Dict, Any, Literal, Annotated, Tuple, TypedDict
 from datetime import datetime
 from pydantic import BaseModel, Field
 from langgraph.graph import MessagesState
@@ -29,6 +30,16 @@ class ParsedRequireItem(BaseModel):
     document_type: Optional[DocumentType] = Field(None, description="Mapped document type if applicable")
     keywords: List[str] = Field(default_factory=list, description="Keywords for searching")
 
+    @cached_property
+    def doc_type_str(self) -> str:
+        """Document type as shown in prompts."""
+        return self.document_type.value if self.document_type else "Not specified"
+
+    @cached_property
+    def keywords_str(self) -> str:
+        """Search keywords as shown in prompts."""
+        return ", ".join(self.keywords) if self.keywords else "None"
+
 class ParsedRequireItemList(BaseModel):
     """List of parsed items."""
     items: List[ParsedRequireItem] = Field(default_factory=list, description="List of items")
@@ -52,6 +63,15 @@ class GathererResult(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in findings")
 
 
+class BatchedGathererResult(GathererResult):
+    """Gatherer result for one item of a batched search."""
+    item_id: str = Field(..., description="ID of the requirement item this result answers")
+
+class GathererBatchResult(BaseModel):
+    """Results from one search covering several requirement items."""
+    results: List[BatchedGathererResult] = Field(default_factory=list, description="One result per requirement item")
+
+
 # Structured output for Evaluator
 class EvaluatorVerdict(BaseModel):
     """Verdict from the evaluator on gathered data."""
@@ -80,9 +100,19 @@ class GathererState(MessagesState):
     parsed_require_item: ParsedRequireItem
     service_details: ServiceInfo
     clinical_context: ClinicalContext
+    case_context: str  # rendered once per run and shared by every item
+    tool_call_keys: Annotated[List[str], operator.add]
+    duplicate_tool_calls: int
     gather_result: GathererResult
     evaluator_verdict: EvaluatorVerdict
 
+class GathererBatchState(TypedDict):
+    """Input for a batched search over items that share a document type."""
+    parsed_require_items: List[ParsedRequireItem]
+    service_details: ServiceInfo
+    clinical_context: ClinicalContext
+    case_context: str
+
 class RequirementAgentState(TypedDict):
     """State for the Requirement handler agent."""
     
@@ -95,10 +125,11 @@ class RequirementAgentState(TypedDict):
     parsed_require_items: List[ParsedRequireItem]
     
     # Gatherer output
-    gatherer_results: Annotated[Dict[int, GathererResult], operator.or_]
+    # (item_id, result) pairs, appended as items finish and keyed once in output
+    gatherer_results: Annotated[List[Tuple[str, GathererResult]], operator.add]
     
     # Evaluator output
-    evaluator_verdicts: Annotated[Dict[int, EvaluatorVerdict], operator.or_]
+    evaluator_verdicts: Annotated[List[Tuple[str, EvaluatorVerdict]], operator.add]
     
     # Final output
     require_item_result: List[RequireItemResult]
@@ -1,40 +1,85 @@
 
 from typing import List
-from .state import GathererState, ParsedRequireItem, GathererResult, RequireItem
-from ...models.core import ServiceInfo, ClinicalContext
+import orjson
+from .state import GathererState, GathererBatchState, ParsedRequireItem, GathererResult, RequireItem
+from ...models.core import ServiceInfo, ClinicalContext, UrgencyLevel
+
+
+_SERVICE_SECTION_TEMPLATE = """## Service Information
+- CPT Codes: {cpt_codes}
+- HCPCS Codes: {hcpcs_codes}
+- Diagnosis Codes (ICD-10): {dx_codes}
+- Site of Service: {site_of_service}
+- Requested Units: {requested_units}
+- Service Period: {service_start_date} to {service_end_date}
+- Urgency Level: {urgency_level}"""
+
+_CLINICAL_SECTION_TEMPLATE = """## Clinical Context
+- Primary Diagnosis: {primary_diagnosis}
+- Supporting Diagnoses: {supporting_diagnoses}
+- Relevant History: {relevant_history}
+- Prior Treatments: {prior_treatments}
+- Clinical Notes: {clinical_notes}"""
+
+
+def _stripped(values: List[str]) -> List[str]:
+    return [value.strip() for value in values]
 
 
 def build_case_context(state: GathererState) -> str:
-    """Build case context section for prompts."""
-    parts = []
+    """Build case context section for prompts.
+
+    Values are rendered canonically (stripped text, sorted treatment keys, ISO dates,
+    enum values) so the same case always produces the same bytes. Code lists keep
+    their order, since the first code is the primary one.
+    """
+    service: ServiceInfo = state.get("service_details")
+    clinical: ClinicalContext = state.get("clinical_context")
+    if not service and not clinical:
+        return ""
 
-    if state.get("service_details"):
-        service = state["service_details"]
-        parts.append(f"""## Service Information
-- CPT Codes: {service.cpt_codes}
-- HCPCS Codes: {service.hcpcs_codes}
-- Diagnosis Codes (ICD-10): {service.dx_codes}
-- Site of Service: {service.site_of_service}
-- Requested Units: {service.requested_units}
-- Service Period: {service.service_start_date} to {service.service_end_date}
-- Urgency Level: {service.urgency_level}""")
-
-    if state.get("clinical_context"):
-        clinical = state["clinical_context"]
-        parts.append(f"""## Clinical Context
-- Primary Diagnosis: {clinical.primary_diagnosis}
-- Supporting Diagnoses: {clinical.supporting_diagnoses}
-- Relevant History: {clinical.relevant_history}
-- Prior Treatments: {clinical.prior_treatments}
-- Clinical Notes: {clinical.clinical_notes}""")
-
-    if parts:
-        return "# Case Context\n\n" + "\n\n".join(parts)
-    return ""
+    parts = []
+    if service:
+        parts.append(_SERVICE_SECTION_TEMPLATE.format(
+            cpt_codes=service.cpt_codes,
+            hcpcs_codes=service.hcpcs_codes,
+            dx_codes=service.dx_codes,
+            site_of_service=service.site_of_service,
+            requested_units=service.requested_units,
+            service_start_date=service.service_start_date.isoformat(),
+            service_end_date=service.service_end_date.isoformat(),
+            # Defaults skip use_enum_values, so the field may hold the enum or its value
+            urgency_level=UrgencyLevel(service.urgency_level).value,
+        ))
+
+    if clinical:
+        parts.append(_CLINICAL_SECTION_TEMPLATE.format(
+            primary_diagnosis=clinical.primary_diagnosis.strip(),
+            supporting_diagnoses=_stripped(clinical.supporting_diagnoses),
+            relevant_history=_stripped(clinical.relevant_history),
+            prior_treatments=[dict(sorted(treatment.items())) for treatment in clinical.prior_treatments],
+            clinical_notes=_stripped(clinical.clinical_notes),
+        ))
+
+    # Trailing whitespace from free-text fields would make otherwise equal prefixes differ
+    return ("# Case Context\n\n" + "\n\n".join(parts)).rstrip()
+
+
+def build_case_context_prompt(state: GathererState) -> str:
+    """Case context sent ahead of each item's gatherer and evaluator prompt.
+
+    It is rendered once per run by the router and identical for every item of a
+    case, so keeping it in its own leading message lets the provider's prefix
+    cache reuse it across items. It is built here only if the router did not.
+    """
+    case_context = state.get("case_context")
+    # An empty context is a valid rendering, so only a missing key is rebuilt
+    return case_context if case_context is not None else build_case_context(state)
 
 
 def build_parser_user_prompt(require_items: List[RequireItem]) -> str:
-    items_text = chr(10).join(
+    """Build the parser prompt for all requested items, which are parsed in a single call."""
+    items_text = "\n".join(
         f"- Item ID: {item.item_id} | Request: {item.requested_item}"
         for item in require_items
     )
@@ -46,47 +91,55 @@ def build_parser_user_prompt(require_items: List[RequireItem]) -> str:
 """
 
 
-def build_gatherer_user_prompt(state: GathererState) -> str:
-    parsed_item: ParsedRequireItem = state["parsed_require_item"]
-    
-    parts = [build_case_context(state)]
-    
-    doc_type = parsed_item.document_type.value if parsed_item.document_type else "Not specified"
-    keywords = ", ".join(parsed_item.keywords) if parsed_item.keywords else "None"
-    
-    parts.append(f"""## Requirement to Satisfy
+def build_gatherer_user_prompt(parsed_item: ParsedRequireItem) -> str:
+    """Build the per-item gatherer prompt; the case context is sent separately."""
+    return f"""Search for information to satisfy this requirement:
+
+## Requirement to Satisfy
 - Original Request: {parsed_item.original_request}
 - Description: {parsed_item.description}
-- Document Type: {doc_type}
-- Search Keywords: {keywords}
-- Optional: {parsed_item.optional}""")
+- Document Type: {parsed_item.doc_type_str}
+- Search Keywords: {parsed_item.keywords_str}
+- Optional: {parsed_item.optional}"""
+
 
-    return "Search for information to satisfy this requirement:\n\n" + "\n\n".join(parts)
+def build_batch_gatherer_user_prompt(state: GathererBatchState, documents: List[dict]) -> str:
+    """Build user prompt for a batched search over items sharing a document type."""
+    parts = [build_case_context_prompt(state)]
+
+    items_text = "\n".join(
+        f"- Item ID: {item.item_id} | Request: {item.original_request} | Description: {item.description} | Optional: {item.optional}"
+        for item in state["parsed_require_items"]
+    )
+    parts.append(f"""## Requirements to Satisfy
+{items_text}""")
+
+    documents_text = "\n".join(orjson.dumps(doc).decode() for doc in documents) if documents else "None found"
+    parts.append(f"""## Patient Documents
+{documents_text}""")
+
+    return "Match the patient documents to each requirement:\n\n" + "\n\n".join(parts)
 
 
 def build_evaluator_user_prompt(
-    state: GathererState,
+    parsed_item: ParsedRequireItem,
     gatherer_result: GathererResult
 ) -> str:
-    """Build user prompt for the evaluator agent."""
-    parsed_item: ParsedRequireItem = state["parsed_require_item"]
-    
-    parts = [build_case_context(state)]
-    
-    parts.append(f"""## Original Requirement
-{parsed_item.original_request}""")
+    """Build the per-item evaluator prompt; the case context is sent separately."""
+    parts = [f"""## Original Requirement
+{parsed_item.original_request}"""]
 
     # Format gathered data
     docs_text = "None found"
     if gatherer_result.found_documents:
-        docs_text = chr(10).join(
+        docs_text = "\n".join(
             f"  - {doc.title} ({doc.document_type})" 
             for doc in gatherer_result.found_documents
         )
     
     evidence_text = "None"
     if gatherer_result.supporting_evidence:
-        evidence_text = chr(10).join(f"  - {e}" for e in gatherer_result.supporting_evidence)
+        evidence_text = "\n".join(f"  - {e}" for e in gatherer_result.supporting_evidence)
 
     parts.append(f"""## Gathered Data
 - Status: {gatherer_result.status.value}
@@ -3,7 +3,7 @@
 import operator
 from typing import List, Optional, Dict, Any, Annotated, TypedDict
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from langgraph.graph import MessagesState
 
@@ -28,6 +28,8 @@ from .requirement import RequireItem, RequireItemResult
 
 class PAIntake(BaseModel):
     """PA intake form data."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     pa_request_id: str = Field(..., description="Unique PA request identifier")
     patient_name: str = Field(..., description="Patient's full name")
     patient_id: str = Field(..., description="Patient's medical record number")
@@ -1,4 +1,8 @@
-from typing import List, Optional, Dict, Literal
+import asyncio
+import contextlib
+import logging
+import os
+from typing import AsyncIterator, List, Optional, Dict, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta, UTC
 
@@ -6,6 +10,7 @@ from ..models.core import ClinicalContext, PAWorkFlowStatus, PayerInfo, ServiceI
 from ..models.integration import AccessPurpose, PARequirement, PAStatusResponse, PAStatus, PatientDataRequest, PHICategory, UploadDocument
 from ..models.hitl import HITLTask, TaskType, TaskPriority, TaskStatus
 from ..models.document import DocumentType, DocumentMappingList, DocumentMetadata
+from ..models.appeal import AppealLetterContent, build_appeal_letter
 from .state import PAIntake, PAAgentState
 from ..integrations.document_service import document_search_tool
 from ..integrations.ehr_service import get_patient_summary
@@ -16,6 +21,8 @@ from .denial.state import DenialCategory, Evidence
 from .requirement import handle_requirements, RequireItem, RequireItemStatus, RequireItemResult
 from ..pa_status_poller import track_submission
 from ..hitl_task_poller import track_hitl_task
+from .cache import TTLCache, make_cache_key
+from .http_client import shared_async_http_client
 from .system_prompts import APPEAL_DRAFT_SYSTEM_PROMPT
 from .user_prompts_builder import build_appeal_user_prompt
 
@@ -23,6 +30,7 @@ from .user_prompts_builder import build_appeal_user_prompt
 from langchain_openai import ChatOpenAI
 from langgraph.errors import NodeInterrupt
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.messages import SystemMessage, HumanMessage
 
@@ -30,9 +38,26 @@ from uuid import uuid4
 from pathlib import Path
 
 appeal_draft_dir = Path(__file__).resolve().parent.parent.parent / "data/appeal"
-
-model = ChatOpenAI(model="gpt-4o-mini", timeout=20, max_retries=3)
-_memory: Optional[MemorySaver] = None
+appeal_draft_dir.mkdir(parents=True, exist_ok=True)
+# Workflow checkpoints are kept here so each PA's state outlives a restart of the agent
+checkpoint_db_path = os.getenv(
+    "PA_CHECKPOINT_DB", str(Path(__file__).resolve().parent.parent.parent / "data/checkpoints.db")
+)
+
+logger = logging.getLogger(__name__)
+
+model = ChatOpenAI(model="gpt-4o-mini", timeout=20, max_retries=3, http_async_client=shared_async_http_client)
+_appeal_model = model.with_structured_output(
+    AppealLetterContent, method="json_schema", prompt_cache_key="pa-appeal-draft"
+)
+_APPEAL_DRAFT_SYSTEM_MESSAGE = SystemMessage(content=APPEAL_DRAFT_SYSTEM_PROMPT)
+# Appeals scored below this with no gathered evidence go to a clinician instead of being drafted
+MIN_APPEAL_STRENGTH_SCORE = 30
+# Provider records and payer PA rules repeat across requests and change rarely
+_provider_cache: TTLCache[ProviderInfo] = TTLCache(maxsize=4096, ttl_seconds=60 * 60)
+_pa_requirement_cache: TTLCache[PARequirement] = TTLCache(maxsize=4096, ttl_seconds=60 * 60)
+_memory: Optional[BaseCheckpointSaver] = None
+_workflow = None
 
 # Console output helper
 def log_status(message: str, is_hitl: bool = False) -> None:
@@ -40,7 +65,33 @@ def log_status(message: str, is_hitl: bool = False) -> None:
     prefix = "🔔 PA Agent:" if is_hitl else "🤖 PA Agent:"
     print(f"{prefix} {message}")
 
-def get_memory() -> MemorySaver:
+@contextlib.asynccontextmanager
+async def open_checkpointer(db_path: str = checkpoint_db_path) -> AsyncIterator[BaseCheckpointSaver]:
+    """Open the workflow checkpointer for the app's lifetime: SQLite when installed, in-memory otherwise.
+
+    get_workflow() compiles against this checkpointer while it is open. The SQLite
+    saver is async-only, so callers must use the graph's a* state methods.
+    """
+    global _memory, _workflow
+    try:
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        logger.warning("langgraph-checkpoint-sqlite is not installed; workflow state will not survive a restart")
+        saver_context = contextlib.nullcontext(MemorySaver())
+    else:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        saver_context = AsyncSqliteSaver.from_conn_string(db_path)
+
+    async with saver_context as saver:
+        _memory, _workflow = saver, None
+        try:
+            yield saver
+        finally:
+            # A workflow compiled against the closed saver must not be handed out again
+            _memory, _workflow = None, None
+
+def get_memory() -> BaseCheckpointSaver:
+    """Return the open checkpointer, or an in-memory one when open_checkpointer() is not in use."""
     global _memory
     if _memory is None:
         _memory = MemorySaver()
@@ -55,7 +106,6 @@ async def intake_node(state: PAIntake) -> PAAgentState:
         supporting_documents=state.supporting_documents,
     )
 
-    service_provider = get_provider_details(state.provider_id)
     log_status("Intake complete. Starting coverage verification...")
 
     return PAAgentState(
@@ -67,16 +117,24 @@ async def intake_node(state: PAIntake) -> PAAgentState:
         additional_notes=state.additional_notes,
         workflow_status=PAWorkFlowStatus.INTAKE,
         clinician_id = state.submitted_by,
-        provider_info=service_provider,
     )
 
 
+async def provider_lookup(state: PAIntake) -> PAAgentState:
+    """Fetch provider details; runs alongside coverage verification."""
+    service_provider = _provider_cache.get(state.provider_id)
+    if service_provider is None:
+        service_provider = await asyncio.to_thread(get_provider_details, state.provider_id)
+        _provider_cache.set(state.provider_id, service_provider)
+    return {"provider_info": service_provider.model_copy(deep=True)}
+
+
 async def determine_coverage(state: PAAgentState) -> PAAgentState:
     log_status("Verifying patient coverage and eligibility...")
-    patient_id: str =  state.get("patient_id")
-    pa_request_id: str = state.get("pa_request_id")
+    patient_id: str = state["patient_id"]
+    pa_request_id: str = state["pa_request_id"]
     
-    limited_patient_summary = get_patient_summary(PatientDataRequest(
+    limited_patient_summary = await asyncio.to_thread(get_patient_summary, PatientDataRequest(
         patient_id=patient_id,
         categories=[PHICategory.COVERAGE],
         purpose=AccessPurpose.ELIGIBILITY_CHECK,
@@ -85,23 +143,25 @@ async def determine_coverage(state: PAAgentState) -> PAAgentState:
     ))
 
     
-    coverage = check_coverage( 
+    coverage = await asyncio.to_thread(
+        check_coverage,
         payer_id=limited_patient_summary.coverage["payer_id"],
         plan_id=limited_patient_summary.coverage["plan_id"],
         patient_id=patient_id
     )
 
     if coverage is not None:
-        log_status(f"Coverage verified: {coverage.plan_details.get('plan_name')}")
+        plan_details = coverage.plan_details
+        log_status(f"Coverage verified: {plan_details.get('plan_name')}")
         return {
             "payer_info" : PayerInfo(
-                payer_id=coverage.plan_details.get("payer_id"),
-                payer_name=coverage.plan_details.get("payer_name"),
-                plan_id=coverage.plan_details.get("plan_id"),
-                member_id=coverage.plan_details.get("member_id"),
-                plan_name=coverage.plan_details.get("plan_name"),
-                effective_date=coverage.plan_details.get("effective_date"),
-                termination_date=coverage.plan_details.get("termination_date")
+                payer_id=plan_details.get("payer_id"),
+                payer_name=plan_details.get("payer_name"),
+                plan_id=plan_details.get("plan_id"),
+                member_id=plan_details.get("member_id"),
+                plan_name=plan_details.get("plan_name"),
+                effective_date=plan_details.get("effective_date"),
+                termination_date=plan_details.get("termination_date")
             ),
             "workflow_status": PAWorkFlowStatus.COVERAGE_DETERMINATON
     }
@@ -123,24 +183,29 @@ async def pa_requirement_discovery(state: PAAgentState) -> PAAgentState:
     diagnosis_codes = service_info.dx_codes
     site_of_service = service_info.site_of_service
     
-    pa_requirement: PARequirement = is_pa_required(
-        payer_id=payer_id, 
-        plan_id=plan_id, 
-        cpt_codes=cpt_codes,
-        hcpcs_codes=hcpcs_codes,
-        dx_codes=diagnosis_codes, 
-        site_of_service=site_of_service
+    cache_key = make_cache_key(
+        payer_id, plan_id, sorted(cpt_codes), sorted(hcpcs_codes), sorted(diagnosis_codes), site_of_service
     )
+    pa_requirement: Optional[PARequirement] = _pa_requirement_cache.get(cache_key)
+    if pa_requirement is None:
+        pa_requirement = await asyncio.to_thread(
+            is_pa_required,
+            payer_id=payer_id, 
+            plan_id=plan_id, 
+            cpt_codes=cpt_codes,
+            hcpcs_codes=hcpcs_codes,
+            dx_codes=diagnosis_codes, 
+            site_of_service=site_of_service
+        )
+        _pa_requirement_cache.set(cache_key, pa_requirement)
+    # Each run gets its own copy, so nothing downstream can alter the cached rules
+    pa_requirement = pa_requirement.model_copy(deep=True)
 
     requirement_id: str = "REQUIREMENT-"+str(uuid4())
-    require_items = []
-    for index, item in enumerate(pa_requirement.required_documentation):
-        require_items.append(
-            RequireItem(
-                item_id=requirement_id+"-"+str(index),
-                requested_item=item
-            )
-        )
+    require_items = [
+        RequireItem(item_id=f"{requirement_id}-{index}", requested_item=item)
+        for index, item in enumerate(pa_requirement.required_documentation)
+    ]
 
     if pa_requirement.required:
         log_status(f"PA required. Found {len(require_items)} documentation requirements.")
@@ -154,15 +219,14 @@ async def pa_requirement_discovery(state: PAAgentState) -> PAAgentState:
     }
 
 async def gather_pa_requirement(state: PAAgentState) -> PAAgentState:
-    require_items: List[RequireItem] = state.get("require_items")
+    require_items: List[RequireItem] = state["require_items"]
     log_status(f"Gathering {len(require_items)} required documents...")
     
-    pa_request_id: str = state.get("pa_request_id")
-    patient_id: str = state.get("patient_id")
-    service_info: ServiceInfo = state.get("service_info")
-    clinical_context: ClinicalContext = state.get("clinical_context")
-    payer_info: PayerInfo = state.get("payer_info")
-    provider_info: ProviderInfo = state.get("provider_info")
+    pa_request_id: str = state["pa_request_id"]
+    patient_id: str = state["patient_id"]
+    service_info: ServiceInfo = state["service_info"]
+    clinical_context: ClinicalContext = state["clinical_context"]
+    payer_info: PayerInfo = state["payer_info"]
     
     requirement_result: List[RequireItemResult] = await handle_requirements(
         patient_id=patient_id,
@@ -187,15 +251,16 @@ async def submission(state: PAAgentState) -> PAAgentState:
     log_status("Submitting PA request to payer...")
     
     # Extract data from state
-    pa_request_id: str = state.get("pa_request_id")
+    pa_request_id: str = state["pa_request_id"]
     patient_id: str = state["patient_id"]
     service_info: ServiceInfo = state["service_info"]
     clinical_context: ClinicalContext = state["clinical_context"]
     payer_info: PayerInfo = state["payer_info"]
     provider_info: ProviderInfo = state["provider_info"]
     
+    # Every part below was validated when it entered the state, so skip revalidating it
     # Update clinical context with collected documents
-    clinical_context_with_docs = ClinicalContext(
+    clinical_context_with_docs = ClinicalContext.model_construct(
         primary_diagnosis=clinical_context.primary_diagnosis,
         supporting_diagnoses=clinical_context.supporting_diagnoses,
         relevant_history=clinical_context.relevant_history,
@@ -204,7 +269,7 @@ async def submission(state: PAAgentState) -> PAAgentState:
     )
     
     # Build PARequest
-    pa_request = PARequest(
+    pa_request = PARequest.model_construct(
         id=pa_request_id,
         patient_id=patient_id,
         requesting_provider=provider_info,
@@ -243,8 +308,8 @@ async def submission(state: PAAgentState) -> PAAgentState:
         }
 
 async def tracking_node(state: PAAgentState) -> PAAgentState:
-    pa_submission_id: str = state.get("submission_id")
-    pa_request_id: str = state.get("pa_request_id")
+    pa_submission_id: str = state["submission_id"]
+    pa_request_id: str = state["pa_request_id"]
 
     #check status
     status: PAStatusResponse = check_pa_status(pa_submission_id)
@@ -263,27 +328,27 @@ async def approved_node(state: PAAgentState) -> PAAgentState:
     return {"workflow_status": PAWorkFlowStatus.RESOLUTION}
 
 async def denial_node(state: PAAgentState) -> PAAgentState:
-    pa_status: PAStatusResponse = state.get("status")
+    pa_status: PAStatusResponse = state["status"]
     log_status(f"Analyzing denial reason: {pa_status.denial_reason}")
-    payer_info: PayerInfo = state.get("payer_info")
+    pa_request_id: str = state["pa_request_id"]
+    payer_info: PayerInfo = state["payer_info"]
 
     result : DenialEvaluationResult = await evaluate_denial(
-        patient_id=state.get("patient_id"),
-        pa_request_id=state.get("pa_request_id"),
+        patient_id=state["patient_id"],
+        pa_request_id=pa_request_id,
         denial_reason=pa_status.denial_reason,
         decision_details=pa_status.decision_details,
         payer_id=payer_info.payer_id,
         plan_id=payer_info.plan_id,
-        service_details=state.get("service_info"),
-        clinical_context=state.get("clinical_context"),
+        service_details=state["service_info"],
+        clinical_context=state["clinical_context"],
         documents_shared=state.get("uploaded_documents")
     )
 
     if result.confidence_score<0.7:
         ##agent not able to conclude, create HITL task
         log_status("Need Human review: Unable to determine best action for this denial.", is_hitl=True)
-        pa_request_id: str = state.get("pa_request_id")
-        clinician_id: str = state.get("clinician_id")
+        clinician_id: str = state["clinician_id"]
         hitl_task = HITLTask(
             task_id="HITL-" + str(uuid4()),
             pa_request_id=pa_request_id,
@@ -306,6 +371,12 @@ async def revise_node(state: PAAgentState) -> PAAgentState:
     log_status("Preparing revised submission with additional documentation...")
     return {"workflow_status": PAWorkFlowStatus.REVISE}
 
+def _write_appeal_draft(path: Path, draft_letter: str) -> None:
+    """Write the draft to a temp file and rename it, so readers never see a partial letter."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(draft_letter)
+    os.replace(tmp_path, path)
+
 async def appeal_node(state: PAAgentState) -> PAAgentState:
     """
     Check appeal readiness and draft an appeal letter using LLM with template.
@@ -313,20 +384,49 @@ async def appeal_node(state: PAAgentState) -> PAAgentState:
     """
     log_status("Drafting appeal letter...")
     from ..models.core import Appeal
-    from ..models.appeal import AppealLetterContent, build_appeal_letter
     
     # Extract state data
-    pa_request_id: str = state.get("pa_request_id")
-    patient_id: str = state.get("patient_id")
-    patient_name: str = state.get("patient_name")
-    denial_evaluation: DenialEvaluationResult = state.get("denial_evaluation")
-    pa_status: PAStatusResponse = state.get("status")
-    service_info: ServiceInfo = state.get("service_info")
-    clinical_context: ClinicalContext = state.get("clinical_context")
-    payer_info: PayerInfo = state.get("payer_info")
-    provider_info: ProviderInfo = state.get("provider_info")
-    clinician_id: str = state.get("clinician_id")
+    pa_request_id: str = state["pa_request_id"]
+    denial_evaluation: DenialEvaluationResult = state["denial_evaluation"]
+    pa_status: PAStatusResponse = state["status"]
+    clinician_id: str = state["clinician_id"]
+
+    if (denial_evaluation.appeal_strength_score or 0) < MIN_APPEAL_STRENGTH_SCORE and not denial_evaluation.evidences:
+        # A letter without evidence behind it is not worth drafting; let a clinician decide
+        hitl_task = HITLTask(
+            task_id="HITL-" + str(uuid4()),
+            pa_request_id=pa_request_id,
+            task_type=TaskType.CLINICAL_REVIEW,
+            title="Appeal lacks supporting evidence",
+            description=f"Appeal strength score is {denial_evaluation.appeal_strength_score}/100 and no supporting evidence was found. Please provide evidence or decide whether to appeal. Denial reason: {pa_status.denial_reason}",
+            context_data={
+                "denial_reason": pa_status.denial_reason,
+                "root_cause": denial_evaluation.root_cause,
+                "required_documents": denial_evaluation.required_documentation,
+                "appeal_strength_score": denial_evaluation.appeal_strength_score
+            },
+            assigned_to=clinician_id,
+        )
+        create_task_for_staff(hitl_task.task_type, hitl_task)
+        log_status("Need Human review: Appeal has no supporting evidence, skipping the draft.", is_hitl=True)
+        return {
+            "workflow_status": PAWorkFlowStatus.APPEAL,
+            "awaiting_clinician_input": True,
+            "pending_hitl_task": hitl_task
+        }
     
+    patient_id: str = state["patient_id"]
+    patient_name: str = state["patient_name"]
+    service_info: ServiceInfo = state["service_info"]
+    clinical_context: ClinicalContext = state["clinical_context"]
+    payer_info: PayerInfo = state["payer_info"]
+    provider_info: ProviderInfo = state["provider_info"]
+
+    # Letter fields that don't depend on the drafted content
+    service_description = f"CPT: {service_info.cpt_codes_str} | DX: {service_info.dx_codes_str}"
+    provider_addr = provider_info.address
+    provider_address_str = f"{provider_addr.get('street', '')}, {provider_addr.get('city', '')}, {provider_addr.get('state', '')} {provider_addr.get('zip', '')}"
+
     # Build prompts
     user_prompt = build_appeal_user_prompt(
         denial_evaluation=denial_evaluation,
@@ -335,15 +435,10 @@ async def appeal_node(state: PAAgentState) -> PAAgentState:
         clinical_context=clinical_context
     )
     
-    structured_model = model.with_structured_output(AppealLetterContent)
-    appeal_content: AppealLetterContent = await structured_model.ainvoke([
-        SystemMessage(APPEAL_DRAFT_SYSTEM_PROMPT),
+    appeal_content: AppealLetterContent = await _appeal_model.ainvoke([
+        _APPEAL_DRAFT_SYSTEM_MESSAGE,
         HumanMessage(user_prompt)
     ])
-    
-    service_description = f"CPT: {', '.join(service_info.cpt_codes)} | DX: {', '.join(service_info.dx_codes)}"
-    provider_addr = provider_info.address
-    provider_address_str = f"{provider_addr.get('street', '')}, {provider_addr.get('city', '')}, {provider_addr.get('state', '')} {provider_addr.get('zip', '')}"
 
     # Build the complete letter from template
     draft_letter = build_appeal_letter(
@@ -365,12 +460,11 @@ async def appeal_node(state: PAAgentState) -> PAAgentState:
     )
 
     appeal_id = "APPEAL-"+str(uuid4())
-    with open(appeal_draft_dir / f"{appeal_id}.txt", "x") as f:
-        f.write(draft_letter)
+    await asyncio.to_thread(_write_appeal_draft, appeal_draft_dir / f"{appeal_id}.txt", draft_letter)
     
     # Create Appeal object
     appeal = Appeal(
-        appeal_id="APPEAL-" + str(uuid4()),
+        appeal_id=appeal_id,
         original_pa_request_id=pa_request_id,
         denial_details={
             "denial_reason": pa_status.denial_reason,
@@ -414,18 +508,14 @@ async def appeal_node(state: PAAgentState) -> PAAgentState:
 
 
 async def rfi_node(state: PAAgentState) -> PAAgentState:
-    pa_status: PAStatusResponse = state.get("status")
+    pa_status: PAStatusResponse = state["status"]
     log_status(f"Payer requested additional information ({len(pa_status.rfi_details)} items)...")
 
     requirement_id: str = "REQUIREMENT-"+str(uuid4())
-    require_items = []
-    for index, item in enumerate(pa_status.rfi_details):
-        require_items.append(
-            RequireItem(
-                item_id=requirement_id+"-"+str(index),
-                requested_item=item
-            )
-        )
+    require_items = [
+        RequireItem(item_id=f"{requirement_id}-{index}", requested_item=item)
+        for index, item in enumerate(pa_status.rfi_details)
+    ]
     
     #save the requiremnt in db
 
@@ -440,7 +530,7 @@ async def validate_requirements(state: PAAgentState):
     item_requires_hitl = [item for item in requirement_result if item.status!=RequireItemStatus.FOUND and not item.optional]
 
     if item_requires_hitl:
-        pa_request_id: str = state.get("pa_request_id")
+        pa_request_id: str = state["pa_request_id"]
         clinician_id: str = state["clinician_id"]
         item_description = []
         item_context = {}
@@ -456,6 +546,7 @@ async def validate_requirements(state: PAAgentState):
                 "state": current_item.status,
             }
 
+        item_description_text = "\n".join(item_description)
         hitl_task = HITLTask(
             task_id="HITL-"+str(uuid4()),
             pa_request_id=pa_request_id,
@@ -463,7 +554,7 @@ async def validate_requirements(state: PAAgentState):
             title=f"Requires more documents or information",
             description=f"""Unable to automatically gather information for below requested information.
 
-    {chr(10).join(item_description)}
+    {item_description_text}
 
     Please provide the required information or document.""",
             context_data=item_context,
@@ -484,8 +575,8 @@ async def validate_requirements(state: PAAgentState):
 
 async def upload_require_documents(state:PAAgentState):
     log_status("Uploading supporting documents to payer...")
-    requirement_result: List[RequireItemResult] = state.get("requirement_result")
-    pa_submission_id: str = state.get("submission_id")
+    requirement_result: List[RequireItemResult] = state["requirement_result"]
+    pa_submission_id: str = state["submission_id"]
 
     documents: List[UploadDocument] = []
     for item in requirement_result:
@@ -495,7 +586,9 @@ async def upload_require_documents(state:PAAgentState):
             #if there is information, create a pdf out of it and upload the information
             pass
     
-    upload_documents(submission_id=pa_submission_id, documents=documents)
+    if documents:
+        # One call uploads the whole batch; keep its file I/O off the event loop
+        await asyncio.to_thread(upload_documents, submission_id=pa_submission_id, documents=documents)
 
     log_status(f"Uploaded {len(documents)} document(s).")
     return {"requirement_result":[], "require_items":[], "uploaded_documents": documents,"workflow_status": PAWorkFlowStatus.UPLOAD_REQUIREMENTS}
@@ -520,7 +613,6 @@ def check_pa_requirement(state: PAAgentState) -> Literal["gather_pa_requirement"
         return "gather_pa_requirement"
 
 def route_after_requirement_validation(state: PAAgentState) -> Literal["human_intervention", "upload_requirements", "submission"]:
-    "human_intervention" if state.get("awaiting_clinician_input") else "submission"
     if state.get("awaiting_clinician_input"):
         return "human_intervention"
     elif not state.get("submission_id"): #PA submission has not happened yet
@@ -528,34 +620,38 @@ def route_after_requirement_validation(state: PAAgentState) -> Literal["human_in
     else:
         return "upload_requirements"
 
+_TRACKING_ROUTES = {
+    PAStatus.APPROVED: "approve",
+    PAStatus.DENIED: "denial",
+    PAStatus.RFI: "rfi",
+}
+
 def router_after_tracking(state: PAAgentState) -> Literal["approve", "denial", "rfi", END]:
-    pa_status: PAStatusResponse = state.get("status")
-    if pa_status.status == PAStatus.APPROVED:
-        return "approve"
-    elif pa_status.status == PAStatus.DENIED:
-        return "denial"
-    elif pa_status.status == PAStatus.RFI:
-        return "rfi"
-    return END
+    pa_status: PAStatusResponse = state["status"]
+    return _TRACKING_ROUTES.get(pa_status.status, END)
+
+_DENIAL_ROUTES = {
+    RecommendedAction.APPEAL: "appeal",
+    RecommendedAction.REVISE_AND_RESUBMIT: "revise",
+}
 
 def route_after_denial(state: PAAgentState) -> Literal["appeal", "revise", "human_intervention", END]:
     if state.get("awaiting_clinician_input", False):
         return "human_intervention"
     
-    denial_evaluation: DenialEvaluationResult = state.get("denial_evaluation")
-    if denial_evaluation.recommendation == RecommendedAction.APPEAL:
-        return "appeal"
-    elif denial_evaluation.recommendation == RecommendedAction.REVISE_AND_RESUBMIT:
-        return "revise"
-    else:
+    denial_evaluation: DenialEvaluationResult = state["denial_evaluation"]
+    route = _DENIAL_ROUTES.get(denial_evaluation.recommendation)
+    if route is None:
         log_status("Final denial. No viable path to approval.")
         return END
+    return route
 
 
 def create_workflow() -> StateGraph:
     workflow = StateGraph(PAAgentState, input_schema=PAIntake)
     workflow.add_node("intake", intake_node)
     workflow.add_node("determine_coverage", determine_coverage)
+    workflow.add_node("provider_lookup", provider_lookup)
     workflow.add_node("pa_requirement_discovery", pa_requirement_discovery)
     workflow.add_node("gather_pa_requirement", gather_pa_requirement)
     workflow.add_node("validate_requirements", validate_requirements)
@@ -574,7 +670,8 @@ def create_workflow() -> StateGraph:
 
     workflow.set_entry_point("intake")
     workflow.add_edge("intake", "determine_coverage")
-    workflow.add_edge("determine_coverage", "pa_requirement_discovery")
+    workflow.add_edge("intake", "provider_lookup")
+    workflow.add_edge(["determine_coverage", "provider_lookup"], "pa_requirement_discovery")
     workflow.add_conditional_edges("pa_requirement_discovery", check_pa_requirement)
     workflow.add_edge("gather_pa_requirement", "validate_requirements")
     workflow.add_conditional_edges("validate_requirements", route_after_requirement_validation)
@@ -590,3 +687,11 @@ def create_workflow() -> StateGraph:
     
     return workflow.compile(checkpointer=get_memory())
 
+
+def get_workflow():
+    """Return the compiled PA workflow, compiling it on first use."""
+    global _workflow
+    if _workflow is None:
+        _workflow = create_workflow()
+    return _workflow
+
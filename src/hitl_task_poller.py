@@ -94,19 +94,19 @@ class HITLTaskPoller:
             f"{tracked.last_status} -> {task.status}"
         )
         
-        if self._workflow is None:
-            from .agent.workflow import create_workflow
-            self._workflow = create_workflow()
+        # Fetched each time: the compiled workflow is replaced whenever the checkpointer is reopened
+        from .agent.workflow import get_workflow
+        self._workflow = get_workflow()
 
         config = {"configurable": {"thread_id": tracked.pa_request_id}}
         if task.task_type == TaskType.REQUIRE_DOCUMENTS:
-            requirement_result: List[RequireItemResult] = self._workflow.get_state(config).values["requirement_result"]
+            requirement_result: List[RequireItemResult] = (await self._workflow.aget_state(config)).values["requirement_result"]
             for item in requirement_result:
                 if item.item_id in task.resolution_data.keys():
                     item.status = RequireItemStatus.FOUND
                     item.documents = [DocumentInfo(**doc) for doc in task.resolution_data[item.item_id].get("documents", [])]
                     item.information = task.resolution_data[item.item_id].get("information", None)
-            self._workflow.update_state(config, {"awaiting_clinician_input": False, "pending_hitl_task": None, "requirement_result": requirement_result})
+            await self._workflow.aupdate_state(config, {"awaiting_clinician_input": False, "pending_hitl_task": None, "requirement_result": requirement_result})
 
 
         try:
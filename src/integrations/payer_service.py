@@ -295,23 +295,22 @@ def upload_documents(
     uploaded_docs = []
     failed_docs = []
     
+    # Initialize supporting_documents if it doesn't exist or is not a list
+    if not isinstance(submission.get("supporting_documents"), list):
+        submission["supporting_documents"] = []
+    
+    # The whole batch is attached in one write with a shared timestamp
+    uploaded_at = datetime.utcnow().isoformat()
     for doc in documents:        
-        # Add document to submission
-        doc_record = {
-            "document_id": doc.document_id,
-            "uploaded_at": datetime.utcnow().isoformat()
-        }
-        
-        # Initialize supporting_documents if it doesn't exist or is not a list
-        if not isinstance(submission.get("supporting_documents"), list):
-            submission["supporting_documents"] = []
-        
         ## fetch and upload docs
-        submission["supporting_documents"].append(doc_record)
+        submission["supporting_documents"].append({
+            "document_id": doc.document_id,
+            "uploaded_at": uploaded_at
+        })
         uploaded_docs.append(doc.document_id)
     
     # Update submission
-    submission["last_updated"] = datetime.utcnow().isoformat()
+    submission["last_updated"] = uploaded_at
     
     _save_json("pa_submissions.json", submissions_data)
     
@@ -1,6 +1,7 @@
 from .hitl_task_poller import start_hitl_polling_service
 from .pa_status_poller import start_PA_polling_service
-from .agent.workflow import create_workflow
+from .agent.workflow import get_workflow, open_checkpointer
+from .agent.http_client import close_shared_http_client
 from .intake_scenarios import get_intake
 
 
@@ -9,36 +10,56 @@ from uuid import uuid4
 from datetime import datetime, timedelta, UTC
 import asyncio
 import logging
+import logging.handlers
+import queue
 
-# Suppress verbose logging from libraries
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("openai").setLevel(logging.WARNING)
-logging.getLogger("langchain").setLevel(logging.WARNING)
-logging.getLogger("langchain_core").setLevel(logging.WARNING)
-logging.getLogger("langgraph").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
+def configure_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue to a console listener thread; returns the started listener."""
+    # Records are written to the console by a listener thread, so log I/O never blocks the event loop
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s", handlers=[logging.handlers.QueueHandler(log_queue)])
+    # Sub-agent progress is logged at INFO
+    logging.getLogger(f"{__package__}.agent").setLevel(logging.INFO)
+
+    # Suppress verbose logging from libraries
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("openai").setLevel(logging.WARNING)
+    logging.getLogger("langchain").setLevel(logging.WARNING)
+    logging.getLogger("langchain_core").setLevel(logging.WARNING)
+    logging.getLogger("langgraph").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+    return listener
 
 
 async def main(intake_id: str):
-    await start_hitl_polling_service()
-    await start_PA_polling_service()
-
-    intake = PAIntake(**(get_intake(intake_id)))
-
-    print("=" * 50)
-    print(f"Running PA workflow for {intake.pa_request_id}")
-    print("=" * 50)
-    
-    workflow = create_workflow()
-    config = {"configurable": {"thread_id": intake.pa_request_id}}
-    await workflow.ainvoke(intake, config=config)
-    
-    # Keep running to let pollers work
+    log_listener = configure_logging()
     try:
-        while True:
-            await asyncio.sleep(1)
+        # The checkpointer stays open for as long as the workflow and pollers run
+        async with open_checkpointer():
+            await start_hitl_polling_service()
+            await start_PA_polling_service()
+
+            intake = PAIntake(**(get_intake(intake_id)))
+
+            print("=" * 50)
+            print(f"Running PA workflow for {intake.pa_request_id}")
+            print("=" * 50)
+
+            workflow = get_workflow()
+            config = {"configurable": {"thread_id": intake.pa_request_id}}
+            await workflow.ainvoke(intake, config=config)
+
+            # Keep running to let pollers work
+            while True:
+                await asyncio.sleep(1)
     except KeyboardInterrupt:
         print("\nShutting down...")
+    finally:
+        await close_shared_http_client()
+        log_listener.stop()
 
 if __name__ == "__main__":
     import sys
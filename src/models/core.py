@@ -2,6 +2,7 @@
 
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
+from functools import cached_property
 from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 from enum import Enum
 
@@ -34,7 +35,7 @@ class PAWorkFlowStatus(str, Enum):
 
 class ServiceInfo(BaseModel):
     """Information about the medical service requiring authorization."""
-    model_config = ConfigDict(use_enum_values=True, validate_assignment=True)
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
     
     cpt_codes: List[str] = Field(..., description="Current Procedural Terminology codes")
     hcpcs_codes: List[str] = Field(default_factory=list, description="Healthcare Common Procedure Coding System codes")
@@ -73,10 +74,25 @@ class ServiceInfo(BaseModel):
             raise ValueError("Service end date must be after start date")
         return self
 
+    @cached_property
+    def cpt_codes_str(self) -> str:
+        """CPT codes as a comma-separated string for prompts and descriptions."""
+        return ", ".join(self.cpt_codes) or "N/A"
+
+    @cached_property
+    def hcpcs_codes_str(self) -> str:
+        """HCPCS codes as a comma-separated string for prompts and descriptions."""
+        return ", ".join(self.hcpcs_codes) or "N/A"
+
+    @cached_property
+    def dx_codes_str(self) -> str:
+        """Diagnosis codes as a comma-separated string for prompts and descriptions."""
+        return ", ".join(self.dx_codes) or "N/A"
+
 
 class ClinicalContext(BaseModel):
     """Clinical information supporting the PA request."""
-    model_config = ConfigDict(use_enum_values=True, validate_assignment=True)
+    model_config = ConfigDict(use_enum_values=True, frozen=True)
     
     primary_diagnosis: str = Field(..., description="Primary diagnosis for the service")
     supporting_diagnoses: List[str] = Field(default_factory=list, description="Additional relevant diagnoses")
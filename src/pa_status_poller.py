@@ -99,16 +99,15 @@ class PAStatusPoller:
             f"{tracked.last_status} -> {status.status}"
         )
         
-        # Initialize workflow if needed
-        if self._workflow is None:
-            from .agent.workflow import create_workflow
-            self._workflow = create_workflow()
+        # Fetched each time: the compiled workflow is replaced whenever the checkpointer is reopened
+        from .agent.workflow import get_workflow
+        self._workflow = get_workflow()
         
         config = {"configurable": {"thread_id": tracked.pa_request_id}}
         
         try:
             # Update state with new status
-            self._workflow.update_state(
+            await self._workflow.aupdate_state(
                 config, 
                 {"status": status}
             )
@@ -1,7 +1,8 @@
 """LangGraph tools for external system interactions."""
 
 from .document import (
-    search_patient_documents
+    search_patient_documents,
+    find_patient_documents
 )
 
 from .ehr import (
@@ -23,6 +24,7 @@ from .policy import (
 __all__ = [
     # Document tools
     "search_patient_documents",
+    "find_patient_documents",
     # EHR tools
     "get_patient_health_record",
     # Medical Coverage DB tools
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from langchain.tools import tool, ToolRuntime
@@ -17,20 +18,12 @@ class DocumentSearchInput(BaseModel):
     )
 
 
-@tool(
-    description="Search Documents/Records for a patient like Lab results, Medical Images, Clinical Notes, etc. "
-                "Returns metadata about matching documents. Can search all document types or filter by specific type.",
-    args_schema=DocumentSearchInput
-)
-async def search_patient_documents(
-    runtime: ToolRuntime, 
-    document_type: DocumentType, 
+def find_patient_documents(
+    patient_id: str,
+    document_type: DocumentType,
     keywords: Optional[List[str]] = None
 ) -> List[dict]:
-    patient_id = runtime.context.get("patient_id")
-    if not patient_id:
-        return []
-    
+    """Return metadata for a patient's final documents of a type matching any of the keywords."""
     results = []
     documents = document_search_tool.search_documents(
         patient_id=patient_id,
@@ -49,3 +42,21 @@ async def search_patient_documents(
             })
     
     return results
+
+
+@tool(
+    description="Search Documents/Records for a patient like Lab results, Medical Images, Clinical Notes, etc. "
+                "Returns metadata about matching documents. Can search all document types or filter by specific type.",
+    args_schema=DocumentSearchInput
+)
+async def search_patient_documents(
+    runtime: ToolRuntime, 
+    document_type: DocumentType, 
+    keywords: Optional[List[str]] = None
+) -> List[dict]:
+    patient_id = runtime.context.get("patient_id")
+    if not patient_id:
+        return []
+    
+    # Off the event loop so the gatherer's other tool calls in this turn run alongside it
+    return await asyncio.to_thread(find_patient_documents, patient_id, document_type, keywords)
@@ -1,5 +1,6 @@
 """EHR (Electronic Health Record) tools for PA workflow."""
 
+import asyncio
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from langchain.tools import tool, ToolRuntime
@@ -37,7 +38,8 @@ async def get_patient_health_record(
     patient_id = runtime.context.get("patient_id")
     if not patient_id:
         return f"Error: No details found"
-    return get_patient_summary(PatientDataRequest(
+    # Off the event loop so the gatherer's other tool calls in this turn run alongside it
+    return await asyncio.to_thread(get_patient_summary, PatientDataRequest(
         patient_id=patient_id,
         categories=categories,
         purpose=purpose,
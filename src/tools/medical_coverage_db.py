@@ -5,6 +5,7 @@ This module provides tools to check medical necessity criteria, validate
 CPT/ICD code pairs, and retrieve coverage determination information.
 """
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -82,7 +83,7 @@ async def get_procedure_details(codes: List[str]) -> List[ProcedureDetail]:
     Args:
         codes: List of CPT/HCPCS codes to look up.
     """
-    procedures = _get_procedures()
+    procedures = await asyncio.to_thread(_get_procedures)
     results = []
     for code in codes:
         if code in procedures:
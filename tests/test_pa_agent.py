@@ -1,14 +1,25 @@
 
 import pytest
+import json
 import os
+from collections import Counter
 from datetime import datetime, timedelta, UTC
+from typing import Optional
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
+import httpx
+import openai
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import ValidationError
+
 os.environ.setdefault("OPENAI_API_KEY", "test-key-for-unit-tests")
 
 from src.agent.workflow import (
     create_workflow,
+    get_workflow,
+    open_checkpointer,
     intake_node,
     determine_coverage,
     pa_requirement_discovery,
@@ -17,6 +28,7 @@ from src.agent.workflow import (
     submission,
     tracking_node,
     denial_node,
+    appeal_node,
     check_pa_requirement,
     route_after_denial,
     router_after_tracking,
@@ -27,12 +39,21 @@ from src.agent.denial.state import (
     RecommendedAction,
     DenialEvaluationResult,
     Evidence,
+    _append_evidence,
 )
 from src.agent.requirement.state import (
     RequireItem,
     RequireItemResult,
     RequireItemStatus,
+    ParsedRequireItem,
+    ParsedRequireItemList,
+    GathererResult,
+    BatchedGathererResult,
+    DocumentInfo,
+    GathererBatchResult,
+    EvaluatorVerdict,
 )
+from src.models.document import DocumentType
 from src.models.core import (
     ServiceInfo,
     ClinicalContext,
@@ -130,6 +151,84 @@ def rfi_status() -> PAStatusResponse:
         rfi_details=["Recent lab results", "Physical therapy notes"],
     )
 
+
+def _sample_service_info(**overrides) -> ServiceInfo:
+    return ServiceInfo(**{
+        "cpt_codes": ["72148"],
+        "hcpcs_codes": [],
+        "dx_codes": ["M54.5"],
+        "site_of_service": "Outpatient",
+        "requested_units": 1,
+        "service_start_date": datetime.now(UTC) + timedelta(days=7),
+        "service_end_date": datetime.now(UTC) + timedelta(days=7),
+        **overrides,
+    })
+
+
+def _judgement(**overrides) -> dict:
+    """Judgement JSON fields in schema order, as the reasoning model streams them."""
+    return {
+        "confidence_score": 0.9,
+        "require_more_evidence": [],
+        "search_plan": ["Review imaging history"],
+        "recommendation": "appeal",
+        "rationale": "Conservative therapy documented for 8 weeks.",
+        "evidence_citations": [],
+        "appeal_strength_score": 70,
+        "clinical_argument_summary": "Failed conservative therapy meets policy criteria.",
+        "required_documentation": [],
+        "write_off_reason": None,
+        **overrides,
+    }
+
+
+class _StreamingReasoningModel:
+    """Stands in for the bound reasoning model, streaming a JSON judgement in small chunks."""
+
+    def __init__(self, judgement: dict, chunk_size: int = 7):
+        self.text = json.dumps(judgement)
+        self.chunk_size = chunk_size
+        self.stream_count = 0
+
+    def bind(self, **kwargs):
+        return self
+
+    async def astream(self, messages):
+        self.stream_count += 1
+        for start in range(0, len(self.text), self.chunk_size):
+            yield AIMessageChunk(content=self.text[start:start + self.chunk_size])
+
+
+def _reasoning_node(model: _StreamingReasoningModel):
+    """Build the denial workflow around the given reasoning model and return its reasoner node."""
+    from src.agent.denial import agent as denial_agent
+
+    with patch.object(denial_agent, "_get_chat_model", return_value=model), \
+         patch.object(denial_agent, "create_categorizer_llm"), \
+         patch.object(denial_agent, "create_gap_analysis_agent"), \
+         patch.object(denial_agent, "create_evidence_gatherer_agent"):
+        workflow = denial_agent.create_denial_evaluation_workflow()
+    return workflow.builder.nodes["reasoner"].runnable.afunc
+
+
+def _settled_batch_result(item_id: str, document_id: Optional[str] = None) -> BatchedGathererResult:
+    found_documents = []
+    if document_id:
+        found_documents = [DocumentInfo(
+            document_id=document_id, title="Lumbar MRI", document_type=list(DocumentType)[0],
+            summary="MRI lumbar spine", relevance_score=0.9,
+        )]
+    return BatchedGathererResult(
+        item_id=item_id,
+        found_documents=found_documents,
+        status=RequireItemStatus.FOUND,
+        search_summary="Matched imaging report",
+        supporting_evidence=["MRI 2024-08-15", "Radiology addendum"],
+        justification="Report covers the requested study",
+        confidence=0.95,
+    )
+
+
 class TestHappyPath:
     """Tests for successful PA approval flow."""
 
@@ -509,3 +608,437 @@ class TestEdgeCases:
             
             # Should return original state when coverage not found
             assert result == state
+
+    @pytest.mark.asyncio
+    async def test_16_checkpoint_round_trip(self, tmp_path):
+        """Test 16: State written through the workflow's checkpointer is read back intact."""
+        config = {"configurable": {"thread_id": "PA-TEST-CKPT"}}
+        status = PAStatusResponse(status=PAStatus.DENIED, status_date=datetime.now(UTC), denial_reason="Not medically necessary")
+
+        async with open_checkpointer(str(tmp_path / "checkpoints.db")):
+            workflow = get_workflow()
+            await workflow.aupdate_state(config, {"pa_request_id": "PA-TEST-CKPT", "status": status}, as_node="tracking")
+            snapshot = await workflow.aget_state(config)
+
+        assert snapshot.values["pa_request_id"] == "PA-TEST-CKPT"
+        assert snapshot.values["status"] == status
+        assert snapshot.next == ("denial",)
+
+
+class TestDenialEvaluation:
+    """Tests for the denial evaluator's caching, streaming gate and evidence handling."""
+
+    @pytest.mark.asyncio
+    async def test_17_repeat_denial_evaluation_served_from_cache(self):
+        """Test 17: Re-evaluating the same denial for the same case skips the denial graph."""
+        from src.agent.denial import agent as denial_agent
+
+        service_info = ServiceInfo(
+            cpt_codes=["72148"],
+            hcpcs_codes=[],
+            dx_codes=["M54.5"],
+            site_of_service="Outpatient",
+            requested_units=1,
+            service_start_date=datetime.now(UTC) + timedelta(days=7),
+            service_end_date=datetime.now(UTC) + timedelta(days=7),
+        )
+        kwargs = dict(
+            patient_id=f"PAT-{uuid4().hex[:8]}",
+            denial_reason="Missing documentation",
+            decision_details={"reason_code": "MD001"},
+            pa_request_id="PA-TEST-001",
+            payer_id="BCBS001",
+            plan_id="PLAN001",
+            service_details=service_info,
+            clinical_context=ClinicalContext(primary_diagnosis="M54.5"),
+            documents_shared=[],
+        )
+
+        with patch.object(denial_agent._denial_evaluation_workflow, "ainvoke", new_callable=AsyncMock) as mock_graph:
+            mock_graph.return_value = {
+                "root_cause": "Missing PT notes",
+                "recommendation": RecommendedAction.REVISE_AND_RESUBMIT,
+                "policy_references": [],
+            }
+
+            first = await denial_agent.evaluate_denial(**kwargs)
+            second = await denial_agent.evaluate_denial(**kwargs)
+
+            mock_graph.assert_awaited_once()
+            assert first == second
+            assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_18_weak_appeal_without_evidence_creates_hitl(self, denied_status):
+        """Test 18: An appeal with a low strength score and no evidence goes to a clinician undrafted."""
+        state = {
+            "pa_request_id": "PA-TEST-001",
+            "clinician_id": "PROV001",
+            "status": denied_status,
+            "denial_evaluation": DenialEvaluationResult(
+                root_cause="Unclear denial reason",
+                recommendation=RecommendedAction.APPEAL,
+                confidence_score=0.8,
+                evidences=[],
+                appeal_strength_score=20,
+                clinical_argument_summary=None,
+                required_documentation=[],
+                policy_references=[],
+            ),
+        }
+
+        with patch("src.agent.workflow._appeal_model") as mock_model, \
+             patch("src.agent.workflow.create_task_for_staff") as mock_task:
+            result = await appeal_node(state)
+
+            mock_model.ainvoke.assert_not_called()
+            mock_task.assert_called_once()
+            assert result["awaiting_clinician_input"] is True
+            assert result["pending_hitl_task"].task_type == TaskType.CLINICAL_REVIEW
+
+    @pytest.mark.asyncio
+    async def test_19_low_confidence_stream_requests_revision_early(self):
+        """Test 19: A low-confidence judgement asks for more evidence as soon as its gate fields stream in."""
+        model = _StreamingReasoningModel(_judgement(
+            confidence_score=0.55,
+            require_more_evidence=["Physical therapy notes"],
+            search_plan=["Search PT notes from the last 12 weeks"],
+        ))
+        reasoner = _reasoning_node(model)
+        state = {"revision_count": 0, "found_evidence": []}
+
+        with patch("src.agent.denial.agent.build_reasoning_user_prompt", return_value="prompt"):
+            result = await reasoner(state)
+
+        assert result["need_revision"] is True
+        assert result["revision_count"] == 1
+        assert result["provisional_confidence"] == 0.55
+        assert result["recommendation"] == RecommendedAction.APPEAL
+        assert result["required_evidence"] == ["Physical therapy notes"]
+        assert "judgement" not in result
+
+    @pytest.mark.asyncio
+    async def test_20_confident_or_invalid_gate_streams_full_judgement(self):
+        """Test 20: A confident gate yields the validated judgement; an invalid one never exits early."""
+        state = {"revision_count": 0, "found_evidence": []}
+
+        with patch("src.agent.denial.agent.build_reasoning_user_prompt", return_value="prompt"):
+            result = await _reasoning_node(_StreamingReasoningModel(_judgement(), chunk_size=3))(state)
+            assert result["need_revision"] is False
+            assert result["judgement"].confidence_score == 0.9
+            assert result["recommendation"] == RecommendedAction.APPEAL
+
+            invalid = _judgement(confidence_score=0.4, require_more_evidence=["PT notes"], recommendation="maybe")
+            with pytest.raises(ValidationError):
+                await _reasoning_node(_StreamingReasoningModel(invalid))(state)
+
+    @pytest.mark.asyncio
+    async def test_21_revision_without_new_evidence_goes_to_human_review(self):
+        """Test 21: A revision that finds nothing new makes no judgement and keeps the low confidence."""
+        from src.agent.denial import agent as denial_agent
+
+        evidence = Evidence(source="EHR", evidence_type="clinical_note", fact="PT for 6 weeks", relevance=0.8)
+        model = _StreamingReasoningModel(_judgement())
+        result = await _reasoning_node(model)({
+            "revision_count": 1,
+            "found_evidence": [evidence],
+            "revision_evidence_count": 1,
+        })
+
+        assert result == {"need_revision": False}
+        assert model.stream_count == 0
+
+        with patch.object(denial_agent._denial_evaluation_workflow, "ainvoke", new_callable=AsyncMock) as mock_graph:
+            mock_graph.return_value = {
+                "root_cause": "Medical necessity unclear",
+                "recommendation": RecommendedAction.APPEAL,
+                "provisional_confidence": 0.55,
+                "found_evidence": [evidence],
+                "policy_references": [],
+            }
+            evaluation = await denial_agent.evaluate_denial(
+                patient_id=f"PAT-{uuid4().hex[:8]}",
+                denial_reason="Medical necessity not established",
+                decision_details=None,
+                pa_request_id="PA-TEST-001",
+                payer_id="BCBS001",
+                plan_id="PLAN001",
+                service_details=_sample_service_info(),
+                clinical_context=ClinicalContext(primary_diagnosis="M54.5"),
+                documents_shared=[],
+            )
+
+        assert evaluation.confidence_score == 0.55
+        assert evaluation.evidences == []
+
+    def test_22_evidence_reducer_drops_repeated_facts(self):
+        """Test 22: Evidence re-found from the same source is not appended twice."""
+        mri = Evidence(source="EHR imaging", evidence_type="imaging", fact="L4-L5 herniation", relevance=0.9)
+        pt = Evidence(source="PT notes", evidence_type="clinical_note", fact="6 weeks of PT", relevance=0.8)
+        mri_again = Evidence(source=" EHR imaging ", evidence_type="imaging", fact="L4-L5 herniation ", relevance=0.7)
+        existing = [mri]
+
+        merged = _append_evidence(existing, [mri_again, pt, pt])
+
+        assert merged == [mri, pt]
+        assert existing == [mri]
+        assert _append_evidence(existing, [mri_again]) is existing
+
+    @pytest.mark.asyncio
+    async def test_23_prefetch_fans_out_per_code_pair(self):
+        """Test 23: Prefetch validates every CPT/ICD pair and skips drug lookup without HCPCS codes."""
+        from src.agent.denial import agent as denial_agent
+
+        prefetch = denial_agent._denial_evaluation_workflow.builder.nodes["prefetch_evidence"].runnable.afunc
+        service_info = _sample_service_info(cpt_codes=["72148", "72158"], dx_codes=["M54.5", "M51.16"])
+        code_result = MagicMock()
+        code_result.model_dump.return_value = {"valid": True}
+
+        with patch.object(denial_agent, "get_patient_summary") as mock_summary, \
+             patch.object(denial_agent, "get_procedure_details") as mock_procedures, \
+             patch.object(denial_agent, "get_drug_coverage_details") as mock_drugs, \
+             patch.object(denial_agent, "validate_codes") as mock_validate:
+            mock_summary.return_value.model_dump.return_value = {"patient_id": "PAT001"}
+            mock_procedures.ainvoke = AsyncMock(return_value=[])
+            mock_drugs.ainvoke = AsyncMock(return_value=[])
+            mock_validate.ainvoke = AsyncMock(return_value=code_result)
+
+            result = await prefetch({"service_details": service_info}, MagicMock(context={"patient_id": "PAT001"}))
+
+        records = result["prefetched_records"]
+        assert mock_validate.ainvoke.await_count == 4
+        assert {tuple(call.args[0].values()) for call in mock_validate.ainvoke.await_args_list} == {
+            (cpt, icd) for cpt in service_info.cpt_codes for icd in service_info.dx_codes
+        }
+        mock_drugs.ainvoke.assert_not_awaited()
+        mock_summary.assert_called_once()
+        assert records["patient_health_record"] == {"patient_id": "PAT001"}
+        assert records["code_validations"] == [{"valid": True}] * 4
+
+
+class TestRequirementAgent:
+    """Tests for requirement gathering prompts, tool handling, batching and retries."""
+
+    def test_24_case_context_renders_identically_for_equivalent_cases(self):
+        """Test 24: Whitespace, treatment key order and enum defaults don't change the case context."""
+        from src.agent.requirement.user_prompts_builder import build_case_context
+
+        start = datetime(2025, 1, 6, tzinfo=UTC)
+        service_kwargs = dict(
+            cpt_codes=["72148"],
+            dx_codes=["M54.5"],
+            site_of_service="Outpatient",
+            requested_units=1,
+            service_start_date=start,
+            service_end_date=start + timedelta(days=1),
+        )
+        first = build_case_context({
+            "service_details": ServiceInfo(**service_kwargs),
+            "clinical_context": ClinicalContext(
+                primary_diagnosis="M54.5",
+                prior_treatments=[{"type": "PT", "weeks": 6}],
+                clinical_notes=["Pain persists  "],
+            ),
+        })
+        second = build_case_context({
+            "service_details": ServiceInfo(**service_kwargs, urgency_level=UrgencyLevel.ROUTINE),
+            "clinical_context": ClinicalContext(
+                primary_diagnosis="M54.5",
+                prior_treatments=[{"weeks": 6, "type": "PT"}],
+                clinical_notes=["Pain persists"],
+            ),
+        })
+
+        assert first == second
+
+    @pytest.mark.asyncio
+    async def test_25_malformed_submitted_result_falls_back_to_decision(self):
+        """Test 25: A GathererResult tool call that fails validation is re-asked through the decision call."""
+        from src.agent.requirement import agent as requirement_agent
+
+        llm = MagicMock()
+        llm.bind_tools.return_value.with_retry.return_value.ainvoke = AsyncMock(return_value=AIMessage(
+            content="",
+            tool_calls=[{"name": "GathererResult", "args": {"status": "bogus"}, "id": "call-1"}],
+        ))
+        decided = GathererResult(
+            status=RequireItemStatus.FOUND,
+            search_summary="Found MRI report",
+            supporting_evidence=["MRI 2024-08-15", "Radiology addendum"],
+            justification="Report matches the request",
+            confidence=0.95,
+        )
+        llm.with_structured_output.return_value.with_retry.return_value.ainvoke = AsyncMock(return_value=decided)
+        item = ParsedRequireItem(
+            item_id="ITEM-1", original_request="Prior MRI report", description="Lumbar MRI report",
+            keywords=["mri"], optional=False,
+        )
+
+        result = await requirement_agent.create_gatherer_subgraph(llm).ainvoke(
+            {"parsed_require_item": item, "case_context": "", "messages": []}
+        )
+
+        assert result["gather_result"] == decided
+        assert isinstance(result["messages"][-1], ToolMessage)
+        assert result["messages"][-1].tool_call_id == "call-1"
+
+    @pytest.mark.asyncio
+    async def test_26_repeated_tool_calls_are_suppressed(self):
+        """Test 26: A tool call repeated with the same arguments is answered without running the tool."""
+        from src.agent.requirement import agent as requirement_agent
+
+        run_tools = requirement_agent.create_gatherer_subgraph(MagicMock()).builder.nodes["tools"].runnable.afunc
+        tool_call = {"name": "search_patient_documents", "args": {"query": "lumbar MRI"}, "id": "call-2"}
+
+        result = await run_tools({
+            "messages": [AIMessage(content="", tool_calls=[tool_call])],
+            "tool_call_keys": [requirement_agent._tool_call_key(tool_call)],
+            "duplicate_tool_calls": 1,
+        }, {})
+
+        assert [message.tool_call_id for message in result["messages"]] == ["call-2"]
+        assert result["messages"][0].content.startswith("Duplicate call suppressed")
+        assert result["tool_call_keys"] == []
+        assert result["duplicate_tool_calls"] == requirement_agent.MAX_DUPLICATE_TOOL_CALLS
+
+    @pytest.mark.asyncio
+    async def test_27_unsettled_and_unknown_batch_answers_fall_back_per_item(self):
+        """Test 27: Only in-batch ids answered once, citing fetched documents, are taken from a batch."""
+        from src.agent.requirement import agent as requirement_agent
+
+        prefix = uuid4().hex[:8]
+        item_ids = [f"{prefix}-{n}" for n in range(5)]
+        parsed_items = [
+            ParsedRequireItem(
+                item_id=item_id, original_request=f"Imaging report {item_id}", description="Imaging report",
+                keywords=["mri"], optional=False, document_type=list(DocumentType)[0],
+            )
+            for item_id in item_ids
+        ]
+        batch_llm = MagicMock()
+        batch_llm.with_retry.return_value.ainvoke = AsyncMock(return_value=GathererBatchResult(results=[
+            _settled_batch_result(item_ids[0], document_id="DOC-MRI"),
+            _settled_batch_result(item_ids[1]),
+            _settled_batch_result(item_ids[1]),
+            _settled_batch_result(item_ids[2], document_id="DOC-INVENTED"),
+            _settled_batch_result("NOT-IN-BATCH"),
+        ]))
+        parser_llm = MagicMock()
+        parser_llm.with_retry.return_value.ainvoke = AsyncMock(return_value=ParsedRequireItemList(items=parsed_items))
+        llm = MagicMock()
+        llm.with_structured_output.side_effect = (
+            lambda schema, **kwargs: batch_llm if schema is GathererBatchResult else parser_llm
+        )
+        subgraph = MagicMock()
+        subgraph.ainvoke = AsyncMock(return_value={
+            "gather_result": GathererResult(
+                status=RequireItemStatus.NOT_FOUND, search_summary="Nothing found",
+                supporting_evidence=[], justification="No matching report", confidence=0.3,
+            ),
+            "evaluator_verdict": EvaluatorVerdict(satisfies_request=False, reasoning="Not found"),
+        })
+
+        with patch.object(requirement_agent, "_get_chat_model", return_value=llm), \
+             patch.object(requirement_agent, "_get_gatherer_subgraph", return_value=subgraph), \
+             patch.object(requirement_agent, "find_patient_documents", return_value=[{"document_id": "DOC-MRI"}]):
+            agent = requirement_agent.create_requirement_handler_agent("test-model")
+            with patch.object(requirement_agent, "get_requirement_agent", return_value=agent):
+                results = await requirement_agent.handle_requirements(
+                    patient_id=f"PAT-{prefix}",
+                    pa_request_id="PA-TEST-001",
+                    payer_id="BCBS001",
+                    plan_id="PLAN001",
+                    require_items=[RequireItem(item_id=item_id, requested_item="Imaging report") for item_id in item_ids],
+                    service_details=_sample_service_info(),
+                    clinical_context=ClinicalContext(primary_diagnosis="M54.5"),
+                )
+
+        assert [result.item_id for result in results] == item_ids
+        assert [result.status for result in results] == [RequireItemStatus.FOUND] + [RequireItemStatus.NOT_FOUND] * 4
+        batch_llm.with_retry.return_value.ainvoke.assert_awaited_once()
+        assert subgraph.ainvoke.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_28_transient_llm_errors_are_retried(self):
+        """Test 28: Connection errors are retried with backoff; other errors fail on the first attempt."""
+        from src.agent.requirement.agent import _with_llm_retry
+
+        attempts = []
+
+        def flaky(_):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+            return "ok"
+
+        def broken(_):
+            attempts.append(1)
+            raise ValueError("bad prompt")
+
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            assert await _with_llm_retry(RunnableLambda(flaky)).ainvoke("prompt") == "ok"
+            assert len(attempts) == 2
+            mock_sleep.assert_awaited_once()
+
+            attempts.clear()
+            with pytest.raises(ValueError):
+                await _with_llm_retry(RunnableLambda(broken)).ainvoke("prompt")
+            assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_29_streamed_results_cover_every_item_once(self):
+        """Test 29: Streaming yields each item once, whether it went through the batch or the per-item node."""
+        from src.agent.requirement import agent as requirement_agent
+
+        prefix = uuid4().hex[:8]
+        item_ids = [f"{prefix}-{n}" for n in range(4)]
+        imaging, other = list(DocumentType)[:2]
+        parsed_items = [
+            ParsedRequireItem(
+                item_id=item_id, original_request=f"Report {item_id}", description="Report",
+                keywords=["mri"], optional=False, document_type=imaging if n < 3 else other,
+            )
+            for n, item_id in enumerate(item_ids)
+        ]
+        batch_llm = MagicMock()
+        batch_llm.with_retry.return_value.ainvoke = AsyncMock(
+            return_value=GathererBatchResult(results=[_settled_batch_result(item_ids[0])])
+        )
+        parser_llm = MagicMock()
+        parser_llm.with_retry.return_value.ainvoke = AsyncMock(return_value=ParsedRequireItemList(items=parsed_items))
+        llm = MagicMock()
+        llm.with_structured_output.side_effect = (
+            lambda schema, **kwargs: batch_llm if schema is GathererBatchResult else parser_llm
+        )
+        subgraph = MagicMock()
+        subgraph.ainvoke = AsyncMock(return_value={
+            "gather_result": GathererResult(
+                status=RequireItemStatus.NOT_FOUND, search_summary="Nothing found",
+                supporting_evidence=[], justification="No matching report", confidence=0.3,
+            ),
+            "evaluator_verdict": EvaluatorVerdict(satisfies_request=False, reasoning="Not found"),
+        })
+
+        with patch.object(requirement_agent, "_get_chat_model", return_value=llm), \
+             patch.object(requirement_agent, "_get_gatherer_subgraph", return_value=subgraph), \
+             patch.object(requirement_agent, "find_patient_documents", return_value=[]):
+            agent = requirement_agent.create_requirement_handler_agent("test-model")
+            with patch.object(requirement_agent, "get_requirement_agent", return_value=agent):
+                streamed = [
+                    result async for result in requirement_agent.stream_requirements(
+                        patient_id=f"PAT-{prefix}",
+                        pa_request_id="PA-TEST-001",
+                        payer_id="BCBS001",
+                        plan_id="PLAN001",
+                        require_items=[RequireItem(item_id=item_id, requested_item="Report") for item_id in item_ids],
+                        service_details=_sample_service_info(),
+                        clinical_context=ClinicalContext(primary_diagnosis="M54.5"),
+                    )
+                ]
+
+        assert Counter(result.item_id for result in streamed) == Counter(item_ids)
+        statuses = {result.item_id: result.status for result in streamed}
+        assert statuses[item_ids[0]] == RequireItemStatus.FOUND
+        assert all(statuses[item_id] == RequireItemStatus.NOT_FOUND for item_id in item_ids[1:])
+        batch_llm.with_retry.return_value.ainvoke.assert_awaited_once()
+        assert subgraph.ainvoke.await_count == 3